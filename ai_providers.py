@@ -0,0 +1,57 @@
+import importlib
+import importlib.util
+from typing import Callable, Dict, Any
+
+
+class Provider:
+    """
+    An AI model backend: the module it needs and a factory building a model object
+    with generate_content(prompt). The module is only imported by create_model.
+    """
+
+    def __init__(self, name: str, module: str, factory: Callable[[Any, str, str], Any]):
+        self.name = name
+        self.module = module
+        self.factory = factory
+
+
+PROVIDERS: Dict[str, Provider] = {}
+
+
+def register_provider(name: str, module: str, factory: Callable[[Any, str, str], Any]):
+    """factory(module, api_key, model_name) -> model, called with the imported module"""
+    PROVIDERS[name] = Provider(name, module, factory)
+
+
+def is_available(name: str) -> bool:
+    """Whether the provider's module is installed, checked without importing it"""
+    provider = PROVIDERS.get(name)
+    if provider is None:
+        return False
+    try:
+        return importlib.util.find_spec(provider.module) is not None
+    except (ImportError, ValueError):
+        # A missing parent package raises instead of returning None
+        return False
+
+
+def create_model(name: str, api_key: str = None, model_name: str = None):
+    """Import the provider's module (first call only; later calls hit sys.modules) and build a model"""
+    provider = PROVIDERS.get(name)
+    if provider is None:
+        raise ValueError(f"Unknown AI provider: {name}")
+    return provider.factory(importlib.import_module(provider.module), api_key, model_name)
+
+
+def _gemini_model(genai, api_key: str, model_name: str):
+    if api_key:
+        genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name or "gemini-1.5-flash")
+
+
+def _stub_model(stub_model, api_key: str, model_name: str):
+    return stub_model.StubGenerativeModel()
+
+
+register_provider("gemini", "google.generativeai", _gemini_model)
+register_provider("stub", "stub_model", _stub_model)
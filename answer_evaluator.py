@@ -1,40 +1,117 @@
+import logging
 import random
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+from evaluation_cache import EvaluationCache
+from evaluator_backends import EvaluatorBackend, GenerativeBackend, create_backend, PROMPT_VERSION
+from gemini_client import GeminiClient
+from keyword_matcher import get_matcher
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Share of the 20 difficulty points a question earns in the rule-based score
+DIFFICULTY_WEIGHTS = {'basic': 0.3, 'intermediate': 0.6, 'advanced': 1.0}
+
+EVALUATE_HELP = "Evaluator latency (mode=single: one answer, mode=batch: one session)"
+AI_ERRORS = metrics.counter("ai_feedback_errors_total", "AI feedback calls that failed or returned no usable JSON")
+AI_FALLBACKS = metrics.counter("evaluation_fallbacks_total",
+                               "Answers scored rule-based only although AI evaluation was enabled")
 
 class HybridEvaluator:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, model=None, cache: EvaluationCache = None,
+                 model_name: str = "gemini-1.5-flash", client: GeminiClient = None, provider: str = "gemini",
+                 backend=None):
         """
         Hybrid Evaluator:
         - Rule-based scoring for offline evaluation
         - Gemini AI-based feedback if api_key provided
+        - model: object with generate_content(prompt) used instead of Gemini (e.g. StubGenerativeModel)
+        - cache: EvaluationCache consulted before every AI call
+        - client: preconfigured GeminiClient (retries, rate limit); built with defaults otherwise
+        - provider: ai_providers entry used with api_key; its SDK is imported on first use
+        - backend: EvaluatorBackend, or the name of one in evaluator_backends (gemini, stub, tfidf);
+          overrides model/client. Its blend_weight sets how much of the final score it decides.
         """
         self.api_key = api_key
-        if self.api_key and GEMINI_AVAILABLE:
-            genai.configure(api_key=self.api_key)
-
+        self.cache = cache
+        if isinstance(backend, str):
+            backend = create_backend(backend, api_key=api_key, model_name=model_name, provider=provider)
+        if backend is None and client is None and model is not None:
+            client = GeminiClient(model=model)
+        if backend is None and client is not None:
+            backend = GenerativeBackend(client)
+        if backend is None:
+            backend = create_backend("gemini", api_key=api_key, model_name=model_name, provider=provider)
+        self.backend: EvaluatorBackend = backend
+        self.client = getattr(backend, "client", None)
+        self.model_name = self.client.model_name if self.client else getattr(backend, "name", model_name)
+        if self.cache is not None:
+            self.cache.invalidate(keep_prompt_version=PROMPT_VERSION)
+
+    @property
+    def ai_enabled(self) -> bool:
+        return self.backend is not None
+
+    @metrics.timer("evaluate_seconds", EVALUATE_HELP, mode="single")
     def evaluate_comprehensive(self, question: Dict[str, Any], response: str) -> Dict[str, Any]:
-        rule_score = self._rule_based_score(question, response)
+        matched = get_matcher(question).matched_keywords(response)
+        rule_score = self._rule_based_score(question, response, matched)
 
         ai_feedback = {}
-        ai_score = None
-        if self.api_key and GEMINI_AVAILABLE:
+        if self.ai_enabled:
             try:
                 ai_feedback = self._ai_feedback(question, response)
-                ai_score = ai_feedback.get('ai_score', None)
             except Exception:
                 ai_feedback = {}
-                ai_score = None
+
+        return self._build_evaluation(rule_score, ai_feedback, matched)
+
+    @metrics.timer("evaluate_seconds", EVALUATE_HELP, mode="batch")
+    def evaluate_batch(self, items: List[Tuple[Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+        """
+        Evaluate a whole session with a single AI round trip.
+        items: (question, response) pairs; results are returned in the same order.
+        Entries missing from or unparseable in the batch reply are retried one by one.
+        """
+        ai_feedbacks = [{} for _ in items]
+        if self.ai_enabled and items:
+            try:
+                ai_feedbacks = self._ai_feedback_batch(items)
+            except Exception as e:
+                AI_ERRORS.inc()
+                logger.warning("Batched AI evaluation failed, retrying per answer: %s", e)
+            for i, (question, response) in enumerate(items):
+                if not ai_feedbacks[i]:
+                    try:
+                        ai_feedbacks[i] = self._ai_feedback(question, response)
+                    except Exception:
+                        ai_feedbacks[i] = {}
+
+        evaluations = []
+        for (question, response), ai_feedback in zip(items, ai_feedbacks):
+            matched = get_matcher(question).matched_keywords(response)
+            rule_score = self._rule_based_score(question, response, matched)
+            evaluations.append(self._build_evaluation(rule_score, ai_feedback, matched))
+        return evaluations
+
+    def evaluate_rule_based(self, question: Dict[str, Any], response: str) -> Dict[str, Any]:
+        """Offline evaluation only; used when the AI call fails or times out"""
+        matched = get_matcher(question).matched_keywords(response)
+        return self._build_evaluation(self._rule_based_score(question, response, matched), {}, matched)
+
+    def _build_evaluation(self, rule_score: float, ai_feedback: Dict[str, Any],
+                          matched_keywords: List[str]) -> Dict[str, Any]:
+        ai_score = ai_feedback.get('ai_score', None) if ai_feedback else None
+
+        if self.ai_enabled and not ai_feedback:
+            AI_FALLBACKS.inc()
 
         # Blend scores if AI available, else just use rule
         if ai_score is not None:
-            final_score = (rule_score * 0.5) + (ai_score * 0.5)  # balanced 50/50
+            weight = self.backend.blend_weight
+            final_score = (rule_score * (1 - weight)) + (ai_score * weight)
         else:
             final_score = rule_score
 
@@ -43,77 +120,98 @@ class HybridEvaluator:
             'overall_feedback': ai_feedback.get('feedback', 'Good attempt, check details.') if ai_feedback else 'Good attempt, check details.',
             'strengths': ai_feedback.get('strengths', []) if ai_feedback else [],
             'improvements': ai_feedback.get('improvements', []) if ai_feedback else [],
-            'evaluation_source': 'AI+Rule-based' if ai_feedback else 'Rule-based',
+            'evaluation_source': self.backend.source if ai_feedback else 'Rule-based',
+            # Kept so callers can reuse the single keyword scan instead of repeating it
+            'matched_keywords': matched_keywords,
             'timestamp': datetime.now().isoformat()
         }
         return evaluation
 
 
-    def _rule_based_score(self, question: Dict[str, Any], response: str) -> float:
+    def _rule_based_score(self, question: Dict[str, Any], response: str, matched: List[str] = None) -> float:
         """
         Improved scoring:
         - Keyword matching (up to 80 points)
         - Difficulty weighting (up to 20 points)
+        matched: keywords already found in the response, to skip rescanning it
         """
         keywords = question.get('keywords', [])
         difficulty = question.get('difficulty', 'basic')
-        difficulty_weight = {'basic': 0.3, 'intermediate': 0.6, 'advanced': 1.0}
 
         if not keywords:
             return 50.0 
 
-        matched_keywords = sum(1 for kw in keywords if kw.lower() in response.lower())
+        if matched is None:
+            matched = get_matcher(question).matched_keywords(response)
+        matched_keywords = len(matched)
         keyword_score = (matched_keywords / len(keywords)) * 80  # keywords dominate
 
         # Difficulty adds weight for harder Qs
-        diff_score = difficulty_weight.get(difficulty, 0.3) * 20
+        diff_score = DIFFICULTY_WEIGHTS.get(difficulty, 0.3) * 20
 
         final_score = keyword_score + diff_score
         return min(final_score, 100)
 
+    def rule_based_scores(self, items: List[Tuple[Dict[str, Any], str]],
+                          difficulty_weights: Dict[str, float] = None) -> List[float]:
+        """
+        Batch form of _rule_based_score for offline re-scoring of many answers,
+        computed with NumPy over a keyword-presence matrix (see batch_scoring).
+        """
+        # numpy/pandas are only needed here, so they are not imported for live interviews
+        from batch_scoring import rule_based_scores
+        return rule_based_scores(items, difficulty_weights).tolist()
+
 
+    @metrics.timer("ai_feedback_seconds", "Latency of single-answer AI feedback (cache hits included)")
     def _ai_feedback(self, question: Dict[str, Any], response: str) -> Dict[str, Any]:
         """
-        Generate AI feedback using Gemini
+        Generate feedback from the evaluator backend
         Returns:
             - feedback text
             - strengths list
             - improvements list
             - ai_score (0-100)
         """
-        prompt = f"""
-        You are an Excel evaluator. Evaluate the following candidate answer to an Excel question.
-        Question: {question.get('question')}
-        Candidate Answer: {response}
-
-        Provide:
-        1. A score from 0 to 100
-        2. 3 key strengths
-        3. 3 areas of improvement
-        4. Overall feedback (brief)
-
-        Output in valid JSON only with keys: ai_score, strengths, improvements, feedback
-        """
+        cached = self._cache_get(question, response)
+        if cached is not None:
+            return cached
 
         try:
-            model = genai.GenerativeModel("gemini-1.5-flash")
-            response_obj = model.generate_content(prompt)
+            feedback = self.backend.evaluate(question, response)
+        except Exception as e:
+            AI_ERRORS.inc()
+            logger.warning("AI feedback unavailable, falling back to rule-based score: %s", e)
+            return {}
+        self._cache_put(question, response, feedback)
+        return feedback
 
-            text = response_obj.text.strip()
+    def _cache_key(self, question: Dict[str, Any], response: str) -> str:
+        return EvaluationCache.make_key(question.get('id'), response, self.model_name, PROMPT_VERSION)
 
-            import json, re
-            # Extract JSON safely
-            json_match = re.search(r"\{.*\}", text, re.DOTALL)
-            if not json_match:
-                return {}
+    def _cache_get(self, question: Dict[str, Any], response: str):
+        # Local backends are cheaper to rerun than to look up
+        if self.cache is None or not self.backend.remote:
+            return None
+        return self.cache.get(self._cache_key(question, response))
 
-            ai_output = json.loads(json_match.group())
+    def _cache_put(self, question: Dict[str, Any], response: str, feedback: Dict[str, Any]):
+        if self.cache is not None and self.backend.remote and feedback:
+            self.cache.put(self._cache_key(question, response), feedback, PROMPT_VERSION)
 
-            return {
-                'ai_score': min(float(ai_output.get('ai_score', 0)), 100),
-                'strengths': ai_output.get('strengths', []),
-                'improvements': ai_output.get('improvements', []),
-                'feedback': ai_output.get('feedback', '')
-            }
-        except Exception as e:
-            return {}
+    def _ai_feedback_batch(self, items: List[Tuple[Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+        """
+        Generate feedback for several answers with one backend call (one prompt for Gemini).
+        Returns one feedback dict per item, {} where the reply had no usable entry.
+        Cached answers are served from the cache and left out of the call.
+        """
+        feedbacks = [self._cache_get(question, response) or {} for question, response in items]
+        pending = [i for i, feedback in enumerate(feedbacks) if not feedback]
+        if not pending:
+            return feedbacks
+
+        for i, feedback in zip(pending, self.backend.evaluate_batch([items[i] for i in pending])):
+            if feedback:
+                feedbacks[i] = feedback
+                self._cache_put(*items[i], feedback)
+        return feedbacks
@@ -1,26 +1,133 @@
 import streamlit as st
+import streamlit.components.v1 as components
 from questions_store import load_storage_agent
 from question_bank_agent import QuestionBankAgent, QuestionGeneratorAgent
 from feedback_generator import FeedbackGenerator
+from evaluation_cache import EvaluationCache
+from evaluation_jobs import EvaluationJobs
+from plan_cache import InterviewPlanCache
+import metrics
+import profiling
 from datetime import datetime
 import os
 import time
+import uuid
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-# Initialize agents
-storage_agent = load_storage_agent("dynamic_questions.json")
-question_bank = QuestionBankAgent()
-question_generator = QuestionGeneratorAgent(question_bank)
-feedback_generator = FeedbackGenerator(api_key=GEMINI_API_KEY, storage_file="dynamic_questions.json")
+# "fragment": server countdown refreshed once a second; "client": countdown runs in the browser
+TIMER_MODE = os.getenv("TIMER_MODE", "fragment")
+# Scores answers alongside the keyword rule: gemini (needs the API key), tfidf (local, offline) or stub
+EVALUATOR_BACKEND = os.getenv("EVALUATOR_BACKEND", "gemini")
 
 # Streamlit config
 st.set_page_config(page_title="AI-Powered Interview App", layout="wide")
 st.title("AI-Powered Excel & Data Interview Platform")
 
+# Initialize agents once per server process; Streamlit re-runs this script on every interaction
+@st.cache_resource(show_spinner=False)
+def get_storage_agent():
+    return load_storage_agent("dynamic_questions.json")
+
+@st.cache_resource(show_spinner=False)
+def get_question_generator():
+    return QuestionGeneratorAgent(QuestionBankAgent(), get_storage_agent())
+
+@st.cache_resource(show_spinner=False)
+def get_plan_cache(count: int):
+    """Question sets for every role, prepared in the background before candidates press Start"""
+    generator = get_question_generator()
+    plan_cache = InterviewPlanCache(generator, get_storage_agent())
+    plan_cache.warm(generator.question_bank.role_focus.keys(), count)
+    return plan_cache
+
+@st.cache_resource(show_spinner=False)
+def get_feedback_generator(api_key: str):
+    cache = EvaluationCache(os.getenv("EVALUATION_CACHE_FILE", "evaluation_cache.db")) if api_key else None
+    blend_weight = os.getenv("EVALUATOR_BLEND_WEIGHT")
+    return FeedbackGenerator(api_key=api_key, storage_file="dynamic_questions.json", cache=cache,
+                             backend=EVALUATOR_BACKEND, blend_weight=float(blend_weight) if blend_weight else None)
+
+@st.cache_resource(show_spinner=False)
+def get_evaluation_jobs(api_key: str):
+    return EvaluationJobs(get_feedback_generator(api_key))
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_server(port: int):
+    """Prometheus scrape endpoint, started once per server process"""
+    return metrics.start_http_server(port)
+
+def render_metrics_panel():
+    """Sidebar view of the hot-path timers and counters (METRICS_ENABLED=1)"""
+    with st.sidebar.expander("⏱️ Performance Metrics"):
+        rows = metrics.summary()
+        if not rows:
+            st.caption("No measurements yet.")
+            return
+        st.dataframe(rows, hide_index=True)
+        st.download_button("Download Prometheus snapshot", metrics.snapshot(),
+                           file_name="metrics.prom", mime="text/plain")
+
+# Timer widgets: neither re-runs the whole script while the candidate is typing
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def render_client_countdown(deadline: float):
+    """Countdown rendered and ticked in the browser; the server only checks the deadline on interaction"""
+    remaining_ms = max(int((deadline - time.time()) * 1000), 0)
+    components.html(f"""
+        <div id="timer" style="font-family: sans-serif; padding: 0.75rem 1rem; border-radius: 0.5rem;
+             background: rgba(255, 189, 69, 0.2); color: #926c05;">
+            ⏳ Time Remaining: <span id="secs">{remaining_ms // 1000}</span> seconds
+        </div>
+        <script>
+            const end = Date.now() + {remaining_ms};
+            function tick() {{
+                const left = Math.max(0, Math.ceil((end - Date.now()) / 1000));
+                document.getElementById("secs").textContent = left;
+                if (left > 0) {{
+                    setTimeout(tick, 250);
+                }} else {{
+                    document.getElementById("timer").textContent = "⏳ Time is up - submit to continue";
+                }}
+            }}
+            tick();
+        </script>
+    """, height=60)
+
+if _fragment is not None:
+    @_fragment(run_every=1)
+    def render_fragment_countdown():
+        """Re-runs only this fragment each second; a full rerun happens once, when time runs out"""
+        deadline = st.session_state.get("question_deadline")
+        if not deadline:
+            return
+        remaining = int(deadline - time.time())
+        if remaining > 0:
+            st.warning(f"⏳ Time Remaining: {remaining} seconds")
+        else:
+            st.warning("⏳ Time Remaining: 0 seconds")
+            st.rerun()
+
+    @_fragment(run_every=1)
+    def render_pending_evaluations(qa_pairs):
+        """Shows each answer's score as it arrives; a full rerun renders the report once all are in"""
+        evaluations = evaluation_jobs.collect(st.session_state["session_id"], qa_pairs)
+        if evaluations is not None:
+            st.session_state["evaluations"] = evaluations
+            st.rerun()
+        results = evaluation_jobs.results(st.session_state["session_id"], len(qa_pairs))
+        finished = sum(1 for f in results if f is not None)
+        st.progress(finished / len(results), text=f"Evaluating answers: {finished} of {len(results)} done")
+        for pair, f in zip(qa_pairs, results):
+            st.markdown(f"**Q:** {pair['question']['question']}")
+            st.markdown(f"**Score:** {f['score']}/100" if f else "_Evaluating..._")
+            st.markdown("---")
+
+storage_agent = get_storage_agent()
+evaluation_jobs = get_evaluation_jobs(GEMINI_API_KEY)
+
 # --- Session state initialization ---
 if "questions" not in st.session_state:
     st.session_state["questions"] = []
@@ -38,185 +145,196 @@ if "candidate_intro" not in st.session_state:
     st.session_state["candidate_intro"] = ""
 if "timer_seconds" not in st.session_state:
     st.session_state["timer_seconds"] = 60  # seconds per question
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex  # groups this interview's background evaluations
 
-# Sidebar controls
-role = st.sidebar.selectbox("Select Candidate Role", ["finance", "operations", "data_analytics"])
-num_questions = 8
-
-# --- Intro screen ---
-if not st.session_state["interview_started"]:
-    st.header("📢 Welcome to the AI-Powered Excel & Data Interview Platform")
-    st.markdown("""
-    ### How this works:
-    - You will be asked **8 questions one at a time**.  
-    - Each question has a **time limit of 60 seconds**.  
-    - After completing all, you’ll receive **detailed evaluation & feedback**.  
-    """)
-    st.session_state["candidate_intro"] = st.text_area(
-        "👤 Please introduce yourself briefly before starting:",
-        value=st.session_state.get("candidate_intro", ""),
-        height=120
-    )
-
-    if st.button("🚀 Start Interview"):
-        if st.session_state["candidate_intro"].strip() == "":
-            st.warning("Please enter your introduction before starting.")
-        else:
-            # Generate questions
-            questions = question_generator.generate_interview_questions(role=role, count=num_questions)
-            st.session_state["questions"] = questions
-            st.session_state["responses"] = [""] * len(questions)
-            st.session_state["current_index"] = 0
-            st.session_state["interview_started"] = True
-            st.session_state["question_deadline"] = time.time() + st.session_state["timer_seconds"]
-            st.session_state["evaluations"] = None
-            st.rerun()
+def save_answer(i: int):
+    """Store the answer to question i and queue its evaluation in the background"""
+    st.session_state["responses"][i] = st.session_state.get(f"resp_{i}", "")
+    evaluation_jobs.submit(st.session_state["session_id"], i, st.session_state["questions"][i],
+                           st.session_state["responses"][i])
 
-    if st.sidebar.button("Show Question Bank Analytics"):
-        analytics = storage_agent.get_analytics()
-        if "error" in analytics:
-            st.error(analytics["error"])
-        else:
-            st.subheader("📊 Question Bank Analytics")
-            st.metric("Total Questions", analytics['total_questions'])
-            st.metric("Total Usage", analytics['total_usage'])
-            st.metric("Average Effectiveness", analytics['average_effectiveness'])
-            st.markdown("**Category Distribution:**")
-            st.bar_chart(analytics['category_distribution'])
-            st.markdown("**Difficulty Distribution:**")
-            st.bar_chart(analytics['difficulty_distribution'])
-            st.markdown("**Top Performing Questions:**")
-            for tq in analytics['top_questions']:
-                st.markdown(f"- {tq['question']} (Effectiveness: {tq['effectiveness']})")
-    st.stop()
-
-# --- Interview in progress ---
-questions = st.session_state["questions"]
-idx = st.session_state["current_index"]
-total = len(questions)
-
-# Auto-advance if timer ended
-if st.session_state.get("question_deadline"):
-    remaining = int(st.session_state["question_deadline"] - time.time())
-    if remaining <= 0:
-        # Save answer if any
-        text_key = f"resp_{idx}"
-        st.session_state["responses"][idx] = st.session_state.get(text_key, "")
-        # Move to next question or mark complete
-        if idx + 1 < total:
-            st.session_state["current_index"] += 1
-            st.session_state["question_deadline"] = time.time() + st.session_state["timer_seconds"]
-        else:
-            st.session_state["current_index"] = total
-            st.session_state["question_deadline"] = None
-        st.rerun()
-
-# --- Check if interview complete ---
-if st.session_state["current_index"] >= total:
-    st.subheader("✅ Interview Complete — Evaluation & Feedback")
-    if st.session_state["evaluations"] is None:
-        qa_pairs = []
-        for i, q in enumerate(questions):
-            resp = st.session_state.get(f"resp_{i}", "") or st.session_state["responses"][i]
-            qa_pairs.append({"question": q, "response": resp})
-        st.session_state["evaluations"] = feedback_generator.generate_bulk_feedback(qa_pairs)
-
-    evaluations = st.session_state["evaluations"]
-    overall_scores = [f["score"] for f in evaluations]
-    avg_score = sum(overall_scores) / len(overall_scores) if overall_scores else 0
-    st.metric("Overall Score", f"{round(avg_score,1)}/100")
-
-    col1, col2 = st.columns(2)
-    with col1:
-        st.subheader("Question-wise Feedback")
-        for f in evaluations:
-            st.markdown(f"**Q:** {f['question']}")
-            st.markdown(f"**Answer:** {f['candidate_response']}")
-            st.markdown(f"**Score:** {f['score']}/100")
-            st.markdown(f"**Feedback:** {f['overall_feedback']}")
-            st.markdown("---")
-    with col2:
-        st.subheader("Quick Metrics")
-        strengths = []
-        improvements = []
-        for f in evaluations:
-            strengths.extend(f.get("strengths", []))
-            improvements.extend(f.get("improvements", []))
-        strengths = list(dict.fromkeys([s for s in strengths if s]))[:10]
-        improvements = list(dict.fromkeys([i for i in improvements if i]))[:10]
-        if strengths:
-            st.write("**Strengths:**")
-            for s in strengths:
-                st.write(f"- {s}")
-        if improvements:
-            st.write("**Improvements:**")
-            for imp in improvements:
-                st.write(f"- {imp}")
-    if st.button("Start New Interview"):
-        for k in list(st.session_state.keys()):
-            del st.session_state[k]
-        st.rerun()
-    st.stop()
-
-# --- Current question display ---
-progress_pct = idx / total if total > 0 else 0
-st.progress(progress_pct)
-st.subheader(f"Question {idx+1} of {total}")
-q = questions[idx]
-st.markdown(f"**{q['question']}**")
-
-# Answer box
-text_key = f"resp_{idx}"
-if text_key not in st.session_state:
-    st.session_state[text_key] = st.session_state["responses"][idx] if idx < len(st.session_state["responses"]) else ""
-answer = st.text_area("Your answer:", value=st.session_state[text_key], key=text_key, height=160,
-                      placeholder="Type your answer here...")
-
-# Timer display
-if st.session_state.get("question_deadline"):
-    remaining = int(st.session_state["question_deadline"] - time.time())
-    if remaining > 0:
-        st.warning(f"⏳ Time Remaining: {remaining} seconds")
-    else:
-        st.warning("⏳ Time Remaining: 0 seconds")
-
-# Action buttons
-col1, col2, col3 = st.columns(3)
-with col1:
-    if st.button("Submit Answer"):
-        st.session_state["responses"][idx] = st.session_state.get(text_key, "")
-        if idx + 1 < total:
-            st.session_state["current_index"] += 1
-            st.session_state["question_deadline"] = time.time() + st.session_state["timer_seconds"]
-        else:
-            st.session_state["current_index"] = total
-            st.session_state["question_deadline"] = None
-        st.rerun()
-with col2:
-    if st.button("Skip / Next"):
-        st.session_state["responses"][idx] = st.session_state.get(text_key, "")
-        if idx + 1 < total:
-            st.session_state["current_index"] += 1
-            st.session_state["question_deadline"] = time.time() + st.session_state["timer_seconds"]
-        else:
-            st.session_state["current_index"] = total
-            st.session_state["question_deadline"] = None
-        st.rerun()
-with col3:
-    if st.button("Previous") and idx > 0:
-        st.session_state["responses"][idx] = st.session_state.get(text_key, "")
-        st.session_state["current_index"] -= 1
-        st.session_state["question_deadline"] = time.time() + st.session_state["timer_seconds"]
-        st.rerun()
+def main():
+    """One rerun of the interview flow; Streamlit executes this script on every interaction"""
+    # Sidebar controls
+    role = st.sidebar.selectbox("Select Candidate Role", ["finance", "operations", "data_analytics"])
+    num_questions = 8
+    plan_cache = get_plan_cache(num_questions)
+    if metrics.is_enabled():
+        if os.getenv("METRICS_PORT"):
+            start_metrics_server(int(os.getenv("METRICS_PORT")))
+        render_metrics_panel()
+
+    # --- Intro screen ---
+    if not st.session_state["interview_started"]:
+        st.header("📢 Welcome to the AI-Powered Excel & Data Interview Platform")
+        st.markdown("""
+        ### How this works:
+        - You will be asked **8 questions one at a time**.  
+        - Each question has a **time limit of 60 seconds**.  
+        - After completing all, you’ll receive **detailed evaluation & feedback**.  
+        """)
+        st.session_state["candidate_intro"] = st.text_area(
+            "👤 Please introduce yourself briefly before starting:",
+            value=st.session_state.get("candidate_intro", ""),
+            height=120
+        )
 
+        if st.button("🚀 Start Interview"):
+            if st.session_state["candidate_intro"].strip() == "":
+                st.warning("Please enter your introduction before starting.")
+            else:
+                # Generate questions
+                questions = plan_cache.pop(role, num_questions)
+                st.session_state["questions"] = questions
+                st.session_state["responses"] = [""] * len(questions)
+                st.session_state["current_index"] = 0
+                st.session_state["interview_started"] = True
+                st.session_state["question_deadline"] = time.time() + st.session_state["timer_seconds"]
+                st.session_state["evaluations"] = None
+                st.rerun()
 
+        if st.sidebar.button("Show Question Bank Analytics"):
+            analytics = storage_agent.get_analytics()
+            if "error" in analytics:
+                st.error(analytics["error"])
+            else:
+                st.subheader("📊 Question Bank Analytics")
+                st.metric("Total Questions", analytics['total_questions'])
+                st.metric("Total Usage", analytics['total_usage'])
+                st.metric("Average Effectiveness", analytics['average_effectiveness'])
+                st.markdown("**Category Distribution:**")
+                st.bar_chart(analytics['category_distribution'])
+                st.markdown("**Difficulty Distribution:**")
+                st.bar_chart(analytics['difficulty_distribution'])
+                st.markdown("**Top Performing Questions:**")
+                for tq in analytics['top_questions']:
+                    st.markdown(f"- {tq['question']} (Effectiveness: {tq['effectiveness']})")
+        st.stop()
 
+    # --- Interview in progress ---
+    questions = st.session_state["questions"]
+    idx = st.session_state["current_index"]
+    total = len(questions)
 
+    # Auto-advance if timer ended. The deadline is enforced here on the server: any interaction
+    # after expiry (including a late "Submit Answer") lands in this block before the buttons run.
+    if st.session_state.get("question_deadline"):
+        remaining = int(st.session_state["question_deadline"] - time.time())
+        if remaining <= 0:
+            # Save answer if any
+            save_answer(idx)
+            # Move to next question or mark complete
+            if idx + 1 < total:
+                st.session_state["current_index"] += 1
+                st.session_state["question_deadline"] = time.time() + st.session_state["timer_seconds"]
+            else:
+                st.session_state["current_index"] = total
+                st.session_state["question_deadline"] = None
+            st.rerun()
 
+    # --- Check if interview complete ---
+    if st.session_state["current_index"] >= total:
+        st.subheader("✅ Interview Complete — Evaluation & Feedback")
+        if st.session_state["evaluations"] is None:
+            qa_pairs = []
+            for i, q in enumerate(questions):
+                resp = st.session_state.get(f"resp_{i}", "") or st.session_state["responses"][i]
+                qa_pairs.append({"question": q, "response": resp})
+            # Most answers were queued as they were submitted; show scores as they land
+            if _fragment is not None:
+                render_pending_evaluations(qa_pairs)
+                st.stop()
+            st.session_state["evaluations"] = evaluation_jobs.wait(st.session_state["session_id"], qa_pairs)
 
+        evaluations = st.session_state["evaluations"]
+        overall_scores = [f["score"] for f in evaluations]
+        avg_score = sum(overall_scores) / len(overall_scores) if overall_scores else 0
+        st.metric("Overall Score", f"{round(avg_score,1)}/100")
 
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("Question-wise Feedback")
+            for f in evaluations:
+                st.markdown(f"**Q:** {f['question']}")
+                st.markdown(f"**Answer:** {f['candidate_response']}")
+                st.markdown(f"**Score:** {f['score']}/100")
+                st.markdown(f"**Feedback:** {f['overall_feedback']}")
+                st.markdown("---")
+        with col2:
+            st.subheader("Quick Metrics")
+            strengths = []
+            improvements = []
+            for f in evaluations:
+                strengths.extend(f.get("strengths", []))
+                improvements.extend(f.get("improvements", []))
+            strengths = list(dict.fromkeys([s for s in strengths if s]))[:10]
+            improvements = list(dict.fromkeys([i for i in improvements if i]))[:10]
+            if strengths:
+                st.write("**Strengths:**")
+                for s in strengths:
+                    st.write(f"- {s}")
+            if improvements:
+                st.write("**Improvements:**")
+                for imp in improvements:
+                    st.write(f"- {imp}")
+        if st.button("Start New Interview"):
+            evaluation_jobs.discard(st.session_state["session_id"])
+            for k in list(st.session_state.keys()):
+                del st.session_state[k]
+            st.rerun()
+        st.stop()
 
+    # --- Current question display ---
+    progress_pct = idx / total if total > 0 else 0
+    st.progress(progress_pct)
+    st.subheader(f"Question {idx+1} of {total}")
+    q = questions[idx]
+    st.markdown(f"**{q['question']}**")
 
+    # Answer box
+    text_key = f"resp_{idx}"
+    if text_key not in st.session_state:
+        st.session_state[text_key] = st.session_state["responses"][idx] if idx < len(st.session_state["responses"]) else ""
+    answer = st.text_area("Your answer:", value=st.session_state[text_key], key=text_key, height=160,
+                          placeholder="Type your answer here...")
 
+    # Timer display
+    if st.session_state.get("question_deadline"):
+        if TIMER_MODE == "fragment" and _fragment is not None:
+            render_fragment_countdown()
+        else:
+            render_client_countdown(st.session_state["question_deadline"])
+
+    # Action buttons
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        if st.button("Submit Answer"):
+            save_answer(idx)
+            if idx + 1 < total:
+                st.session_state["current_index"] += 1
+                st.session_state["question_deadline"] = time.time() + st.session_state["timer_seconds"]
+            else:
+                st.session_state["current_index"] = total
+                st.session_state["question_deadline"] = None
+            st.rerun()
+    with col2:
+        if st.button("Skip / Next"):
+            save_answer(idx)
+            if idx + 1 < total:
+                st.session_state["current_index"] += 1
+                st.session_state["question_deadline"] = time.time() + st.session_state["timer_seconds"]
+            else:
+                st.session_state["current_index"] = total
+                st.session_state["question_deadline"] = None
+            st.rerun()
+    with col3:
+        if st.button("Previous") and idx > 0:
+            st.session_state["responses"][idx] = st.session_state.get(text_key, "")
+            st.session_state["current_index"] -= 1
+            st.session_state["question_deadline"] = time.time() + st.session_state["timer_seconds"]
+            st.rerun()
 
-st.rerun()
\ No newline at end of file
+# PROFILE=1 writes a cProfile of every rerun to PROFILE_DIR (see profiling.py)
+with profiling.profile("app_rerun"):
+    main()
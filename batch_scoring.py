@@ -0,0 +1,62 @@
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from answer_evaluator import DIFFICULTY_WEIGHTS
+
+
+def _group_key(question: Dict[str, Any]) -> Tuple:
+    # Keywords and difficulty are part of the key so edited copies of a question score separately
+    return (question.get('id'), tuple(question.get('keywords', [])), question.get('difficulty', 'basic'))
+
+
+def rule_based_scores(items: List[Tuple[Dict[str, Any], str]],
+                      difficulty_weights: Dict[str, float] = None) -> np.ndarray:
+    """
+    Vectorised equivalent of HybridEvaluator._rule_based_score over many answers.
+    items: (question, response) pairs; returns one score per pair, in order.
+    Answers are grouped by question and lowercased once; each keyword is then
+    tested against the whole group, giving a presence matrix (answers x keywords)
+    whose row means make the keyword score.
+    difficulty_weights: overrides DIFFICULTY_WEIGHTS, e.g. when re-scoring history
+    """
+    weights = DIFFICULTY_WEIGHTS if difficulty_weights is None else difficulty_weights
+    scores = np.full(len(items), 50.0)
+
+    groups: Dict[Tuple, List[int]] = {}
+    for position, (question, _) in enumerate(items):
+        groups.setdefault(_group_key(question), []).append(position)
+
+    for (_, keywords, difficulty), positions in groups.items():
+        if not keywords:
+            continue  # no keywords: flat 50, as in the per-item scorer
+        positions = np.asarray(positions)
+        # Lowercased with str.lower, as KeywordMatcher does; Arrow's lower() differs on a few characters
+        responses = pd.Series([(items[i][1] or "").lower() for i in positions], dtype="string")
+
+        presence = np.empty((len(positions), len(keywords)), dtype=bool)
+        for column, keyword in enumerate(keywords):
+            presence[:, column] = responses.str.contains(keyword.lower(), regex=False).to_numpy(dtype=bool)
+
+        keyword_score = (presence.sum(axis=1) / len(keywords)) * 80
+        diff_score = weights.get(difficulty, 0.3) * 20
+        scores[positions] = np.minimum(keyword_score + diff_score, 100)
+    return scores
+
+
+def rescore_frame(frame: pd.DataFrame, questions: Dict[Any, Dict[str, Any]],
+                  difficulty_weights: Dict[str, float] = None) -> pd.Series:
+    """
+    Re-score a table of historical answers.
+    frame: needs 'question_id' and 'response' columns
+    questions: question id -> question (with its current keywords and difficulty)
+    Rows whose question is unknown get NaN.
+    """
+    known = frame['question_id'].isin(list(questions.keys()))
+    subset = frame[known]
+    items = [(questions[qid], response)
+             for qid, response in zip(subset['question_id'], subset['response'])]
+    scores = pd.Series(np.nan, index=frame.index)
+    scores[known] = rule_based_scores(items, difficulty_weights)
+    return scores
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness: question selection, scoring, persistence and a simulated interview
+on synthetic question banks, with Gemini replaced by a local stub.
+
+    python benchmark.py                                  # 1k, 10k and 100k questions
+    python benchmark.py --sizes 1000 --stub-latency 0.2 --output before.json
+    python benchmark.py --backend journal --output journal.json
+
+Results are written as JSON (one record per operation and bank size) so runs
+from different commits can be compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+ROLES = ["finance", "operations", "data_analytics"]
+DIFFICULTIES = ["basic", "intermediate", "advanced"]
+FILLER = ["I", "would", "use", "the", "function", "to", "get", "values", "in", "column", "cell",
+          "then", "check", "result", "table", "data", "sheet", "and", "copy", "down"]
+
+
+def synthetic_bank(size: int, seed: int) -> dict:
+    """A question bank file with `size` questions spread over the real categories and roles"""
+    from question_bank_agent import QuestionBankAgent
+
+    bank = QuestionBankAgent()
+    rng = random.Random(seed)
+    categories = list(bank.question_categories)
+    questions = []
+    for question_id in range(1, size + 1):
+        category = rng.choice(categories)
+        functions = bank.question_categories[category]
+        usage = rng.randint(0, 40)
+        questions.append({
+            "id": question_id,
+            "question": f"Synthetic question {question_id}: how would you use {rng.choice(functions)} here?",
+            "type": rng.choice(["formula", "concept"]),
+            "category": category,
+            "difficulty": rng.choice(DIFFICULTIES),
+            "keywords": rng.sample(functions, min(len(functions), rng.randint(1, 3))),
+            "target_roles": [role for role, focus in bank.role_focus.items() if category in focus] or ["finance"],
+            "usage_count": usage,
+            "avg_score": round(rng.uniform(20, 90), 1) if usage else 0.0,
+            "success_rate": round(rng.random(), 2) if usage else 0.0,
+            "effectiveness_score": round(rng.random(), 3),
+            "created_date": "2025-09-15T07:00:00",
+            "performance_history": [],
+            "generated": False
+        })
+    return {"questions": questions, "metadata": {"total_interviews": 0, "version": "1.0"}}
+
+
+def synthetic_answer(question: dict, rng: random.Random) -> str:
+    words = rng.sample(FILLER, rng.randint(4, 12))
+    for keyword in question.get("keywords", []):
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words) + 1), keyword)
+    return " ".join(words)
+
+
+def measure(fn, repeat: int, budget: float) -> dict:
+    """Call fn up to `repeat` times (at least once, stopping early after `budget` seconds)"""
+    timings = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < repeat and (not timings or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    ordered = sorted(timings)
+    return {
+        "runs": len(timings),
+        "mean_ms": round(statistics.mean(timings), 4),
+        "p50_ms": round(ordered[len(ordered) // 2], 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "min_ms": round(ordered[0], 4)
+    }
+
+
+def bench_bank(size: int, backend: str, repeat: int, budget: float, stub_latency: float, seed: int):
+    from questions_store import load_storage_agent, clear_storage_registry
+    from question_bank_agent import QuestionBankAgent, QuestionGeneratorAgent
+    from answer_evaluator import HybridEvaluator
+    from feedback_generator import FeedbackGenerator
+    from stub_model import StubGenerativeModel
+
+    rng = random.Random(seed)
+    workdir = tempfile.mkdtemp(prefix="benchmark_")
+    storage_file = os.path.join(workdir, "bank.json")
+    with open(storage_file, "w", encoding="utf-8") as f:
+        json.dump(synthetic_bank(size, seed), f)
+    os.environ["QUESTION_STORE_DB"] = os.path.join(workdir, "bank.db")
+
+    results = []
+
+    def record(name, fn, runs=repeat):
+        stats = measure(fn, runs, budget)
+        results.append({"operation": name, "bank_size": size, "backend": backend, **stats})
+        print(f"  {name:<40} {stats['mean_ms']:>10.3f} ms  (p95 {stats['p95_ms']:.3f}, {stats['runs']} runs)")
+
+    try:
+        clear_storage_registry()
+        record("storage.load", lambda: load_storage_agent(storage_file, backend=backend, shared=False), runs=max(repeat // 10, 3))
+        storage = load_storage_agent(storage_file, backend=backend)
+        ids = [q['id'] for q in storage.get_questions_by_criteria()]
+
+        record("storage.save", storage.save_questions, runs=max(repeat // 10, 3))
+        record("storage.get_questions_by_criteria", lambda: storage.get_questions_by_criteria(
+            category="lookup_functions", difficulty=rng.choice(DIFFICULTIES), role=rng.choice(ROLES), count=5))
+        record("storage.get_best_questions", lambda: storage.get_best_questions(rng.choice(ROLES), count=6))
+        record("storage.update_question_performance", lambda: storage.update_question_performance(
+            rng.choice(ids), rng.randint(0, 100)), runs=max(repeat // 10, 3))
+
+        generator = QuestionGeneratorAgent(QuestionBankAgent(), storage)
+        record("generator.generate_interview_questions",
+               lambda: generator.generate_interview_questions(rng.choice(ROLES), count=8))
+
+        evaluator = HybridEvaluator(api_key=None)
+        questions = storage.get_questions_by_criteria(count=200)
+        answers = [(q, synthetic_answer(q, rng)) for q in questions]
+        record("evaluator._rule_based_score", lambda: [evaluator._rule_based_score(q, a) for q, a in answers])
+
+        feedback = FeedbackGenerator(storage=storage, model=StubGenerativeModel(latency=stub_latency))
+        record("feedback.generate_bulk_feedback", lambda: feedback.generate_bulk_feedback([
+            {"question": q, "response": synthetic_answer(q, rng)}
+            for q in generator.generate_interview_questions(rng.choice(ROLES), count=8)
+        ]), runs=max(repeat // 10, 3))
+    finally:
+        clear_storage_registry()
+        os.environ.pop("QUESTION_STORE_DB", None)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--backend", choices=["json", "journal", "sqlite"], default="json")
+    parser.add_argument("--repeat", type=int, default=50, help="runs per operation (fewer for writes)")
+    parser.add_argument("--budget", type=float, default=10.0, help="max seconds per operation")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="seconds per stubbed Gemini call")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": vars(args),
+        "results": []
+    }
+    for size in args.sizes:
+        print(f"Bank of {size:,} questions ({args.backend}):")
+        report["results"].extend(bench_bank(size, args.backend, args.repeat, args.budget, args.stub_latency, args.seed))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
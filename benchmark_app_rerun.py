@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: wall time of a Streamlit rerun of app.py, driven by streamlit.testing's
+AppTest, on the seed bank or a synthetic bank of --size questions.
+
+    python benchmark_app_rerun.py                      # seed bank
+    python benchmark_app_rerun.py --size 10000 --reruns 20
+
+The first run builds whatever the app caches per process; the reruns after it
+are what every widget interaction costs. Wall times include AppTest's own
+overhead (it polls the script thread); run with PROFILE=1 to see the time spent
+in the script itself (profiling.py). Runs in a temporary directory, so
+dynamic_questions.json is not touched.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, APP_DIR)
+
+
+def run_benchmark(size: int, reruns: int, seed: int):
+    from streamlit.testing.v1 import AppTest
+
+    workdir = tempfile.mkdtemp(prefix="app_rerun_")
+    bank_file = os.path.join(workdir, "dynamic_questions.json")
+    if size:
+        from benchmark import synthetic_bank
+        with open(bank_file, "w", encoding="utf-8") as f:
+            json.dump(synthetic_bank(size, seed), f)
+    else:
+        shutil.copy(os.path.join(APP_DIR, "dynamic_questions.json"), bank_file)
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        app = AppTest.from_file(os.path.join(APP_DIR, "app.py"), default_timeout=600)
+        started = time.perf_counter()
+        app.run()
+        first = (time.perf_counter() - started) * 1000
+        if app.exception:
+            raise RuntimeError(app.exception[0].value)
+
+        timings = []
+        for _ in range(reruns):
+            started = time.perf_counter()
+            app.run()
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    bank = f"{size:,} synthetic questions" if size else "seed bank"
+    print(f"{bank}: first run {first:.1f} ms; rerun median {statistics.median(timings):.1f} ms, "
+          f"min {min(timings):.1f} ms over {reruns} reruns")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=0, help="synthetic bank size (0: the seed bank)")
+    parser.add_argument("--reruns", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    run_benchmark(args.size, args.reruns, args.seed)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: re-score synthetic answers with the vectorised batch scorer
+and compare against the per-item HybridEvaluator._rule_based_score loop.
+
+    python benchmark_rescoring.py                 # 1,000,000 answers
+    python benchmark_rescoring.py --answers 200000 --loop-sample 20000
+    python benchmark_rescoring.py --parity-only   # just the parity check
+
+A parity check runs first: batch and per-item scores must agree (np.allclose) on
+random questions covering edge cases (no keywords, empty or non-ASCII keywords,
+unknown difficulty, edited copies sharing an id, missing responses).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PARITY_TERMS = ["SUM", "SUMIF", "sum", "IF", "VLOOKUP", "INDEX-MATCH", "$", "pivot table", "", "Größe",
+                "İ", "ǅ", "a.b", "(", "*"]
+
+FILLER = ["I", "would", "use", "the", "function", "to", "get", "values", "in", "column", "cell",
+          "then", "check", "result", "table", "data", "sheet", "and", "copy", "down"]
+
+
+def load_questions(storage_file: str):
+    with open(storage_file, "r", encoding="utf-8") as f:
+        return json.load(f).get("questions", [])
+
+
+def synthetic_answers(questions, count: int, seed: int):
+    """(question, answer) pairs mixing each question's keywords into filler text"""
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        question = rng.choice(questions)
+        words = rng.sample(FILLER, rng.randint(4, 12))
+        for keyword in question.get("keywords", []):
+            if rng.random() < 0.5:
+                words.insert(rng.randrange(len(words) + 1), rng.choice([keyword, keyword.lower()]))
+        items.append((question, " ".join(words)))
+    return items
+
+
+def parity_items(count: int, seed: int):
+    """(question, answer) pairs built to trip up the vectorised scorer"""
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        question = {
+            # Few ids, so edited copies of a question (same id, other keywords) are common
+            'id': rng.randint(1, 20),
+            'keywords': rng.sample(PARITY_TERMS, rng.randint(0, 5)),
+            'difficulty': rng.choice(['basic', 'intermediate', 'advanced', 'expert'])
+        }
+        words = [rng.choice(PARITY_TERMS + FILLER) for _ in range(rng.randint(0, 10))]
+        response = " ".join(word.upper() if rng.random() < 0.3 else word for word in words)
+        items.append((question, None if rng.random() < 0.02 else response))
+    return items
+
+
+def check_parity(count: int, seed: int) -> bool:
+    import numpy as np
+    from answer_evaluator import HybridEvaluator
+    from batch_scoring import rule_based_scores
+
+    items = parity_items(count, seed)
+    evaluator = HybridEvaluator(api_key=None)
+    expected = np.array([evaluator._rule_based_score(question, response) for question, response in items])
+    scores = rule_based_scores(items)
+    matches = np.isclose(scores, expected)
+    print(f"Parity:      {int(matches.sum()):,}/{count:,} batch scores equal the per-item scores")
+    for position in np.flatnonzero(~matches)[:5]:
+        question, response = items[position]
+        print(f"    keywords={question['keywords']!r} response={response!r}: "
+              f"batch {scores[position]} vs per-item {expected[position]}")
+    return bool(np.allclose(scores, expected))
+
+
+def run_benchmark(answers: int, loop_sample: int, storage_file: str, seed: int):
+    from answer_evaluator import HybridEvaluator
+    from batch_scoring import rule_based_scores
+
+    questions = load_questions(storage_file)
+    print(f"Generating {answers:,} synthetic answers over {len(questions)} questions...")
+    items = synthetic_answers(questions, answers, seed)
+
+    started = time.perf_counter()
+    scores = rule_based_scores(items)
+    batch_seconds = time.perf_counter() - started
+
+    evaluator = HybridEvaluator(api_key=None)
+    sample = items[:loop_sample]
+    started = time.perf_counter()
+    loop_scores = [evaluator._rule_based_score(question, response) for question, response in sample]
+    loop_seconds = time.perf_counter() - started
+    loop_estimate = loop_seconds * answers / max(len(sample), 1)
+
+    mismatches = sum(1 for a, b in zip(scores[:len(sample)], loop_scores) if abs(a - b) > 1e-9)
+
+    print(f"Vectorised:  {batch_seconds:.2f}s for {answers:,} answers "
+          f"({answers / batch_seconds:,.0f} answers/s)")
+    print(f"Per-item:    {loop_seconds:.2f}s for {len(sample):,} answers "
+          f"(~{loop_estimate:.2f}s extrapolated to {answers:,})")
+    print(f"Speed-up:    {loop_estimate / batch_seconds:.1f}x")
+    print(f"Mean score:  {scores.mean():.2f}")
+    print(f"Mismatches against per-item scores: {mismatches}")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, default=1_000_000)
+    parser.add_argument("--loop-sample", type=int, default=100_000,
+                        help="answers scored with the per-item loop (time is extrapolated)")
+    parser.add_argument("--storage-file", default="dynamic_questions.json")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--parity-answers", type=int, default=20_000, help="answers in the parity check")
+    parser.add_argument("--parity-only", action="store_true", help="run the parity check and skip the timing")
+    args = parser.parse_args()
+
+    success = check_parity(args.parity_answers, args.seed)
+    if success and not args.parity_only:
+        success = run_benchmark(args.answers, args.loop_sample, args.storage_file, args.seed)
+    sys.exit(0 if success else 1)
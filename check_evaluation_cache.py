@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Evaluation cache check: runs HybridEvaluator against StubGenerativeModel with a
+throwaway EvaluationCache and counts the model calls, so every cache decision is
+visible:
+
+    hit          the same answer (up to case and whitespace) is not sent twice
+    ttl          an entry older than ttl_seconds is evaluated again
+    eviction     beyond max_entries the least recently used entry is dropped
+    prompt bump  a new PROMPT_VERSION discards the entries of the old one
+
+    python check_evaluation_cache.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import answer_evaluator
+from answer_evaluator import HybridEvaluator
+from evaluation_cache import EvaluationCache
+from stub_model import StubGenerativeModel
+
+QUESTION = {'id': 1, 'question': 'Sum a range', 'keywords': ['SUM'], 'difficulty': 'basic'}
+
+# last_access is a wall-clock time; keep accesses apart on coarse clocks
+TICK = 0.02
+
+
+def make_evaluator(cache: EvaluationCache):
+    model = StubGenerativeModel()
+    return HybridEvaluator(model=model, cache=cache), model
+
+
+def check_hit(workdir: str) -> bool:
+    evaluator, model = make_evaluator(EvaluationCache(os.path.join(workdir, "hit.db")))
+    first = evaluator.evaluate_comprehensive(QUESTION, "I would use SUM")
+    second = evaluator.evaluate_comprehensive(QUESTION, "  i would use   SUM ")
+    return model.calls == 1 and evaluator.cache.hits == 1 and first['score'] == second['score']
+
+
+def check_ttl(workdir: str) -> bool:
+    evaluator, model = make_evaluator(EvaluationCache(os.path.join(workdir, "ttl.db"), ttl_seconds=0.1))
+    evaluator.evaluate_comprehensive(QUESTION, "I would use SUM")
+    evaluator.evaluate_comprehensive(QUESTION, "I would use SUM")
+    calls_before_expiry = model.calls
+    time.sleep(0.2)
+    evaluator.evaluate_comprehensive(QUESTION, "I would use SUM")
+    return calls_before_expiry == 1 and model.calls == 2
+
+
+def check_eviction(workdir: str) -> bool:
+    cache = EvaluationCache(os.path.join(workdir, "lru.db"), max_entries=3)
+    evaluator, model = make_evaluator(cache)
+    for answer in ["answer a", "answer b", "answer c", "answer a", "answer d"]:
+        # "answer a" is used again before "answer d" arrives, so "answer b" is the least recent
+        evaluator.evaluate_comprehensive(QUESTION, answer)
+        time.sleep(TICK)
+    calls = model.calls
+    evaluator.evaluate_comprehensive(QUESTION, "answer a")
+    kept = model.calls == calls
+    evaluator.evaluate_comprehensive(QUESTION, "answer b")
+    evicted = model.calls == calls + 1
+    return calls == 4 and kept and evicted and cache.stats()['entries'] == 3
+
+
+def check_prompt_bump(workdir: str) -> bool:
+    cache = EvaluationCache(os.path.join(workdir, "prompt.db"))
+    evaluator, _ = make_evaluator(cache)
+    evaluator.evaluate_comprehensive(QUESTION, "I would use SUM")
+    original = answer_evaluator.PROMPT_VERSION
+    answer_evaluator.PROMPT_VERSION = original + "-bumped"
+    try:
+        evaluator, model = make_evaluator(cache)
+        dropped = cache.stats()['entries'] == 0
+        evaluator.evaluate_comprehensive(QUESTION, "I would use SUM")
+        return dropped and model.calls == 1
+    finally:
+        answer_evaluator.PROMPT_VERSION = original
+
+
+CHECKS = {
+    "hit": check_hit,
+    "ttl": check_ttl,
+    "eviction": check_eviction,
+    "prompt bump": check_prompt_bump,
+}
+
+
+def check() -> bool:
+    workdir = tempfile.mkdtemp(prefix="cache_check_")
+    success = True
+    try:
+        for name, run in CHECKS.items():
+            ok = run(workdir)
+            print(f"[{'ok' if ok else 'FAIL'}] {name}")
+            success = success and ok
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check() else 1)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check: cold start of the CLI orchestrator and of the rule-based
+evaluation path, measured with `python -X importtime`.
+
+    python check_import_time.py
+    python check_import_time.py --budget-ms 100 --runs 5
+
+Each scenario runs in a fresh interpreter; the time counted is the cumulative import
+time of every module it loads beyond those a bare `python -c pass` loads at startup.
+Fails if a scenario is over budget or imports a module that only the AI or UI
+paths need (the Gemini SDK, pandas/NumPy, Streamlit).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "interview_orchestrator": "import interview_orchestrator",
+    # An API key is set but no answer goes to the AI, so the SDK must stay unimported
+    "rule-based evaluation": (
+        "from answer_evaluator import HybridEvaluator\n"
+        "evaluator = HybridEvaluator(api_key='unused')\n"
+        "evaluator.evaluate_rule_based({'question': 'Sum a range', 'keywords': ['SUM'],"
+        " 'difficulty': 'basic'}, 'I would use SUM')"
+    ),
+}
+
+FORBIDDEN = ["google.generativeai", "pandas", "numpy", "streamlit"]
+
+
+def import_times(code: str):
+    """{module: cumulative microseconds} for the top-level imports of one fresh interpreter"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(f"Scenario failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    top_level = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        module = name.strip()
+        modules[module] = int(cumulative)
+        if name[1:3] != "  ":
+            top_level[module] = int(cumulative)
+    return top_level, modules
+
+
+def check(budget_ms: float, runs: int) -> bool:
+    baseline, _ = import_times("pass")
+    success = True
+    for scenario, code in SCENARIOS.items():
+        best = None
+        for _ in range(runs):
+            top_level, modules = import_times(code)
+            loaded = {module: us for module, us in top_level.items() if module not in baseline}
+            total = sum(loaded.values()) / 1000
+            if best is None or total < best:
+                best, best_loaded = total, loaded
+        heavy = [name for name in FORBIDDEN if name in modules]
+        slowest = sorted(((us, module) for module, us in best_loaded.items()), reverse=True)[:3]
+
+        over = best > budget_ms
+        status = "FAIL" if over or heavy else "ok"
+        print(f"[{status}] {scenario}: {best:.1f} ms (budget {budget_ms:.0f} ms)")
+        print("       slowest: " + ", ".join(f"{module} {us / 1000:.1f} ms" for us, module in slowest))
+        if heavy:
+            print(f"       imports modules reserved for the AI/UI paths: {', '.join(heavy)}")
+        success = success and not over and not heavy
+    return success
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="max import time per scenario")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per scenario (best run counts)")
+    args = parser.parse_args()
+
+    success = check(args.budget_ms, args.runs)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Keyword matcher check: the Aho-Corasick KeywordMatcher must find exactly what the
+substring scan it replaced found (`kw.lower() in response.lower()`), so rule-based
+scores do not move. Random keyword sets over a small alphabet force overlapping
+and nested keywords (SUM inside SUMIF); mixed-case Excel terms and whitespace cover
+the realistic case.
+
+    python check_keyword_matcher.py
+    python check_keyword_matcher.py --rounds 20000 --seed 7
+
+Checked per round: matched_keywords against the substring scan, scan() positions
+against every str.find occurrence, word_boundary matches against a regex, and
+HybridEvaluator._rule_based_score against the old scoring formula.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from answer_evaluator import HybridEvaluator, DIFFICULTY_WEIGHTS
+from keyword_matcher import KeywordMatcher
+
+EXCEL_TERMS = ["SUM", "SUMIF", "SUMIFS", "IF", "COUNT", "COUNTIF", "INDEX", "MATCH", "INDEX-MATCH",
+               "VLOOKUP", "LOOKUP", "pivot table", "$", "cell reference", "range"]
+
+
+def random_text(rng: random.Random, alphabet: str, length: int) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def substring_matches(keywords, text):
+    """The scan KeywordMatcher replaced"""
+    return [kw for kw in keywords if kw.lower() in text.lower()]
+
+
+def all_positions(keyword: str, text: str):
+    keyword, text = keyword.lower(), text.lower()
+    if not keyword:
+        return [0]
+    positions, start = [], text.find(keyword)
+    while start != -1:
+        positions.append(start)
+        start = text.find(keyword, start + 1)
+    return positions
+
+
+def boundary_matches(keywords, text):
+    return [kw for kw in keywords
+            if kw and re.search(r"(?<![A-Za-z0-9_])" + re.escape(kw.lower()) + r"(?![A-Za-z0-9_])", text.lower())]
+
+
+def old_rule_based_score(question, response):
+    keywords = question.get('keywords', [])
+    if not keywords:
+        return 50.0
+    matched = sum(1 for kw in keywords if kw.lower() in response.lower())
+    return min((matched / len(keywords)) * 80 + DIFFICULTY_WEIGHTS.get(question['difficulty'], 0.3) * 20, 100)
+
+
+def check(rounds: int, seed: int) -> bool:
+    rng = random.Random(seed)
+    evaluator = HybridEvaluator()
+    failures = []
+    for round_number in range(rounds):
+        if round_number % 2:
+            keywords = rng.sample(EXCEL_TERMS, rng.randint(1, 6))
+            words = [rng.choice(EXCEL_TERMS + ["use", "the", "=", "(A1:A10)", "a"]) for _ in range(rng.randint(0, 12))]
+            text = " ".join(word.lower() if rng.random() < 0.5 else word for word in words)
+        else:
+            keywords = [random_text(rng, "abAB", rng.randint(0, 4)) for _ in range(rng.randint(1, 6))]
+            text = random_text(rng, "abAB _-", rng.randint(0, 30))
+
+        matcher = KeywordMatcher(keywords)
+        if matcher.matched_keywords(text) != substring_matches(keywords, text):
+            failures.append(("matched_keywords", keywords, text))
+        positions = matcher.scan(text)
+        for index, keyword in enumerate(keywords):
+            expected = all_positions(keyword, text)
+            if sorted(positions.get(index, [])) != expected:
+                failures.append(("scan positions", keywords, text))
+                break
+        if [kw for kw in matcher.matched_keywords(text, word_boundary=True) if kw] != boundary_matches(keywords, text):
+            failures.append(("word_boundary", keywords, text))
+
+        question = {'id': round_number, 'keywords': keywords, 'difficulty': rng.choice(list(DIFFICULTY_WEIGHTS))}
+        if evaluator._rule_based_score(question, text) != old_rule_based_score(question, text):
+            failures.append(("rule-based score", keywords, text))
+
+    status = "FAIL" if failures else "ok"
+    print(f"[{status}] {rounds} random keyword sets: {len(failures)} mismatches")
+    for kind, keywords, text in failures[:5]:
+        print(f"       {kind}: keywords={keywords!r} text={text!r}")
+    return not failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sys.exit(0 if check(args.rounds, args.seed) else 1)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+TF-IDF backend check: every question the app ships (the seeded bank and the
+expanded templates) must get a similarity score, not the {} that leaves it
+rule-based, and an answer that only restates the question must score below the
+question's reference answer.
+
+    python check_tfidf_backend.py
+"""
+
+import json
+import os
+import sys
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from evaluator_backends import create_backend
+from question_bank_agent import QuestionBankAgent
+
+
+def check() -> bool:
+    bank_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dynamic_questions.json")
+    with open(bank_file, "r", encoding="utf-8") as f:
+        seeded = json.load(f)["questions"]
+    templates = QuestionBankAgent().expand_templates()
+    backend = create_backend("tfidf", corpus=seeded + templates)
+
+    success = True
+    for source, questions in (("seeded", seeded), ("template", templates)):
+        unscored, echo_wins = [], []
+        for question in questions:
+            reference = backend.evaluate(question, backend.reference_text(question))
+            echo = backend.evaluate(question, question["question"])
+            if not reference or not echo:
+                unscored.append(question["question"])
+            elif echo["ai_score"] >= reference["ai_score"]:
+                echo_wins.append(question["question"])
+        ok = not unscored and not echo_wins
+        print(f"[{'ok' if ok else 'FAIL'}] {source}: {len(questions) - len(unscored)}/{len(questions)} scored")
+        for text in unscored:
+            print(f"       no TF-IDF score: {text}")
+        for text in echo_wins:
+            print(f"       restating the question scores as high as the reference: {text}")
+        success = success and ok
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check() else 1)
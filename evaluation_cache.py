@@ -0,0 +1,106 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+def normalise_answer(text: str) -> str:
+    """Case- and whitespace-insensitive form of an answer, so trivially different copies share a key"""
+    return re.sub(r"\s+", " ", (text or "")).strip().lower()
+
+
+class EvaluationCache:
+    """
+    On-disk cache of AI evaluations keyed by a hash of
+    (question id, normalised answer, model name, prompt version).
+    Entries expire after ttl_seconds; beyond max_entries the least recently
+    used ones are evicted.
+    """
+
+    def __init__(self, cache_file: str = "evaluation_cache.db", ttl_seconds: float = 7 * 24 * 3600,
+                 max_entries: int = 10000):
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS evaluations (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._connection().execute(
+            "CREATE INDEX IF NOT EXISTS idx_evaluations_access ON evaluations(last_access)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.cache_file, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(question_id: Any, response: str, model_name: str, prompt_version: str) -> str:
+        raw = "\x1f".join([str(question_id), normalise_answer(response), model_name, prompt_version])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached evaluation, or None on a miss or expired entry"""
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute("SELECT value, created_at FROM evaluations WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            if row is not None:
+                conn.execute("DELETE FROM evaluations WHERE key = ?", (key,))
+            with self._counter_lock:
+                self.misses += 1
+            return None
+        conn.execute("UPDATE evaluations SET last_access = ? WHERE key = ?", (now, key))
+        with self._counter_lock:
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any], prompt_version: str):
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO evaluations(key, value, prompt_version, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), prompt_version, now, now)
+        )
+        # Size bound: drop the least recently used entries beyond max_entries
+        conn.execute(
+            "DELETE FROM evaluations WHERE key IN (SELECT key FROM evaluations ORDER BY last_access "
+            "LIMIT MAX(0, (SELECT COUNT(*) FROM evaluations) - ?))",
+            (self.max_entries,)
+        )
+
+    def invalidate(self, keep_prompt_version: str = None) -> int:
+        """Drop every entry, or every entry not produced by keep_prompt_version; returns the count removed"""
+        conn = self._connection()
+        if keep_prompt_version is None:
+            return conn.execute("DELETE FROM evaluations").rowcount
+        return conn.execute(
+            "DELETE FROM evaluations WHERE prompt_version != ?", (keep_prompt_version,)
+        ).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._connection().execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': entries
+        }
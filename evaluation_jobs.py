@@ -0,0 +1,176 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+
+class EvaluationJobs:
+    """
+    Background evaluation of interview answers.
+    Each answer is queued on a worker pool as soon as the candidate moves past its
+    question, so most scores are ready by the time the last answer is submitted.
+    Jobs are grouped per interview session and indexed by question position; an
+    answer edited after going back with "Previous" replaces its earlier job.
+    Answers still waiting when the interview ends (never queued, edited, or not
+    yet picked up by a worker) are evaluated together with one batched AI call.
+    """
+
+    def __init__(self, feedback_generator, max_workers: int = 4, session_ttl: float = 3600.0):
+        self.feedback_generator = feedback_generator
+        self.session_ttl = session_ttl  # abandoned sessions are dropped after this many seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="evaluation-job")
+        self._sessions: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_id: str, index: int, question: Dict[str, Any], response: str):
+        """Queue the answer at `index`; a no-op if the same answer is already queued or scored"""
+        response = response or ""
+        with self._lock:
+            self._prune()
+            self._touched[session_id] = time.time()
+            jobs = self._sessions.setdefault(session_id, {})
+            job = jobs.get(index)
+            if job and job['question_id'] == question.get('id') and job['response'] == response:
+                return
+            if job:
+                job['future'].cancel()
+            job = self._new_job(question, response)
+            job['future'] = self._executor.submit(self._run, job)
+            jobs[index] = job
+
+    def submit_batch(self, session_id: str, qa_pairs: List[Dict]):
+        """
+        Queue every answer that is not being evaluated yet, in one batched call when
+        there are two or more. Answers already running or scored are left alone;
+        single evaluations still waiting for a worker are folded into the batch.
+        """
+        with self._lock:
+            self._prune()
+            self._touched[session_id] = time.time()
+            jobs = self._sessions.setdefault(session_id, {})
+            fresh, waiting = [], []
+            for index, pair in enumerate(qa_pairs):
+                question, response = pair['question'], pair['response'] or ""
+                job = jobs.get(index)
+                if job and job['question_id'] == question.get('id') and job['response'] == response:
+                    if not job['batched'] and not job['future'].running() and not job['future'].done():
+                        waiting.append(index)
+                    continue
+                if job:
+                    job['future'].cancel()
+                fresh.append((index, self._new_job(question, response)))
+
+            if len(fresh) + len(waiting) >= 2:
+                # cancel() fails for a job a worker picked up meanwhile; that one keeps running
+                fresh += [(index, self._new_job(jobs[index]['question'], jobs[index]['response']))
+                          for index in waiting if jobs[index]['future'].cancel()]
+            if len(fresh) == 1:
+                index, job = fresh[0]
+                job['future'] = self._executor.submit(self._run, job)
+                jobs[index] = job
+            elif fresh:
+                for index, job in fresh:
+                    # Each answer keeps its own future, so replacing one later leaves the rest of the batch
+                    job['future'] = Future()
+                    job['batched'] = True
+                    jobs[index] = job
+                self._executor.submit(self._run_batch, [job for _, job in fresh])
+
+    def results(self, session_id: str, count: int) -> List[Optional[Dict[str, Any]]]:
+        """Feedback for answers 0..count-1, None for those still being evaluated"""
+        with self._lock:
+            jobs = dict(self._sessions.get(session_id, {}))
+        return [self._result(jobs.get(index)) for index in range(count)]
+
+    def collect(self, session_id: str, qa_pairs: List[Dict]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Feedback for a finished interview, or None while answers are still pending.
+        Answers not being evaluated yet are queued first, together (see submit_batch).
+        Once everything is scored the session is closed and its scores are committed
+        to storage in one batch.
+        """
+        self.submit_batch(session_id, qa_pairs)
+        feedback_list = self.results(session_id, len(qa_pairs))
+        if any(feedback is None for feedback in feedback_list):
+            return None
+
+        with self._lock:
+            owner = self._sessions.pop(session_id, None) is not None
+            self._touched.pop(session_id, None)
+        if owner:
+            self.feedback_generator.record_feedback(feedback_list)
+        return feedback_list
+
+    def wait(self, session_id: str, qa_pairs: List[Dict], poll_interval: float = 0.1) -> List[Dict[str, Any]]:
+        """Block until collect() has every result"""
+        while True:
+            feedback_list = self.collect(session_id, qa_pairs)
+            if feedback_list is not None:
+                return feedback_list
+            time.sleep(poll_interval)
+
+    def discard(self, session_id: str):
+        """Forget a session, cancelling any evaluations that have not started"""
+        with self._lock:
+            jobs = self._sessions.pop(session_id, {})
+            self._touched.pop(session_id, None)
+        for job in jobs.values():
+            job['future'].cancel()
+
+    @staticmethod
+    def _new_job(question: Dict[str, Any], response: str) -> Dict[str, Any]:
+        return {'question': question, 'question_id': question.get('id'), 'response': response,
+                'started': None, 'fallback': None, 'batched': False}
+
+    def _run(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        job['started'] = time.time()
+        return self.feedback_generator.evaluate_response(job['question'], job['response'])
+
+    def _run_batch(self, batch: List[Dict[str, Any]]):
+        """Evaluate the batch's live jobs with one evaluate_batch call and resolve their futures"""
+        live = [job for job in batch if job['future'].set_running_or_notify_cancel()]
+        if not live:
+            return
+        started = time.time()
+        for job in live:
+            job['started'] = started
+        try:
+            results = self.feedback_generator.evaluator.evaluate_batch(
+                [(job['question'], job['response']) for job in live])
+            for job, result in zip(live, results):
+                job['future'].set_result(
+                    self.feedback_generator.evaluate_response(job['question'], job['response'], result))
+        except Exception as e:
+            for job in live:
+                if not job['future'].done():
+                    job['future'].set_exception(e)
+
+    def _result(self, job: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if job is None:
+            return None
+        future = job['future']
+        if future.done():
+            try:
+                return future.result()
+            except Exception:
+                return self._fallback(job)
+        started = job['started']
+        if started is not None and time.time() - started > self.feedback_generator.eval_timeout:
+            # Slow AI call: don't hold up the report, use the offline score for this answer
+            return self._fallback(job)
+        return None
+
+    def _fallback(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        if job['fallback'] is None:
+            evaluator = self.feedback_generator.evaluator
+            result = evaluator.evaluate_rule_based(job['question'], job['response'])
+            job['fallback'] = self.feedback_generator.evaluate_response(job['question'], job['response'], result)
+        return job['fallback']
+
+    def _prune(self):
+        cutoff = time.time() - self.session_ttl
+        for session_id in [sid for sid, touched in self._touched.items() if touched < cutoff]:
+            for job in self._sessions.pop(session_id, {}).values():
+                job['future'].cancel()
+            del self._touched[session_id]
@@ -0,0 +1,173 @@
+import json
+import logging
+import re
+from typing import Dict, Any, List, Tuple, Callable, Optional
+
+import ai_providers
+from gemini_client import GeminiClient
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the evaluation prompts change; cached evaluations from other versions are discarded
+PROMPT_VERSION = "1"
+
+# Share of the final score taken from the backend; the rule-based keyword score gets the rest
+BLEND_WEIGHTS = {'gemini': 0.5, 'stub': 0.5, 'tfidf': 0.4}
+
+
+class EvaluatorBackend:
+    """
+    Scores answers for HybridEvaluator alongside the keyword rule.
+    evaluate returns {ai_score, strengths, improvements, feedback}, or raises if the
+    backend could not produce one. remote backends are called through the
+    evaluation cache and the feedback timeouts; local ones run in-process.
+    """
+    name = "base"
+    remote = False
+    source = "AI+Rule-based"   # evaluation_source of answers this backend scored
+
+    def __init__(self, blend_weight: float = None):
+        self.blend_weight = BLEND_WEIGHTS.get(self.name, 0.5) if blend_weight is None else blend_weight
+
+    def evaluate(self, question: Dict[str, Any], response: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def evaluate_batch(self, items: List[Tuple[Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+        """One feedback dict per item, {} where there is none; may raise if the whole batch failed"""
+        return [self.evaluate(question, response) for question, response in items]
+
+
+class GenerativeBackend(EvaluatorBackend):
+    """Prompts a generative model (Gemini, or StubGenerativeModel offline) through a GeminiClient"""
+    remote = True
+
+    def __init__(self, client: GeminiClient, name: str = "gemini", blend_weight: float = None):
+        self.client = client
+        self.name = name
+        super().__init__(blend_weight)
+
+    def evaluate(self, question: Dict[str, Any], response: str) -> Dict[str, Any]:
+        prompt = f"""
+        You are an Excel evaluator. Evaluate the following candidate answer to an Excel question.
+        Question: {question.get('question')}
+        Candidate Answer: {response}
+
+        Provide:
+        1. A score from 0 to 100
+        2. 3 key strengths
+        3. 3 areas of improvement
+        4. Overall feedback (brief)
+
+        Output in valid JSON only with keys: ai_score, strengths, improvements, feedback
+        """
+        text = self.client.generate(prompt)
+
+        # Extract JSON safely
+        json_match = re.search(r"\{.*\}", text, re.DOTALL)
+        if not json_match:
+            raise ValueError("AI reply contained no JSON object")
+        return self.parse(json.loads(json_match.group()))
+
+    def evaluate_batch(self, items: List[Tuple[Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+        """All items in one prompt; entries missing from the reply come back as {}"""
+        feedbacks = [{} for _ in items]
+        blocks = "\n".join(
+            f"""
+        Item {i}
+        Question: {question.get('question')}
+        Candidate Answer: {response}
+        """
+            for i, (question, response) in enumerate(items, start=1)
+        )
+        prompt = f"""
+        You are an Excel evaluator. Evaluate each of the following candidate answers to Excel questions.
+
+        For every item provide:
+        1. A score from 0 to 100
+        2. 3 key strengths
+        3. 3 areas of improvement
+        4. Overall feedback (brief)
+
+        Output valid JSON only: an array with one object per item, each with keys:
+        item (the item number), ai_score, strengths, improvements, feedback
+        {blocks}
+        """
+
+        text = self.client.generate(prompt)
+        json_match = re.search(r"\[.*\]", text, re.DOTALL)
+        if not json_match:
+            logger.warning("Batched AI reply contained no JSON array")
+            return feedbacks
+        try:
+            entries = json.loads(json_match.group())
+        except ValueError as e:
+            logger.warning("Batched AI reply was not valid JSON: %s", e)
+            return feedbacks
+        if not isinstance(entries, list):
+            return feedbacks
+
+        for position, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                continue
+            try:
+                index = int(entry.get('item', position + 1)) - 1
+                if 0 <= index < len(items):
+                    feedbacks[index] = self.parse(entry)
+            except (TypeError, ValueError):
+                continue
+        return feedbacks
+
+    @staticmethod
+    def parse(ai_output: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'ai_score': min(float(ai_output.get('ai_score', 0)), 100),
+            'strengths': ai_output.get('strengths', []),
+            'improvements': ai_output.get('improvements', []),
+            'feedback': ai_output.get('feedback', '')
+        }
+
+
+# Factories take the options they use and ignore the rest, so callers can pass one option set to any backend
+def _gemini_backend(api_key: str = None, model_name: str = "gemini-1.5-flash", provider: str = "gemini",
+                    blend_weight: float = None, **_) -> Optional[EvaluatorBackend]:
+    if not api_key or not ai_providers.is_available(provider):
+        return None
+    # The provider SDK is imported when the first answer is sent for AI feedback
+    client = GeminiClient(model_name=model_name, model_factory=lambda: ai_providers.create_model(
+        provider, api_key, model_name))
+    return GenerativeBackend(client, name="gemini", blend_weight=blend_weight)
+
+
+def _stub_backend(latency: float = 0.0, blend_weight: float = None, **_) -> EvaluatorBackend:
+    from stub_model import StubGenerativeModel
+    return GenerativeBackend(GeminiClient(model=StubGenerativeModel(latency=latency)), name="stub",
+                             blend_weight=blend_weight)
+
+
+def _tfidf_backend(corpus: List[Dict] = (), reference_answers: Dict[Any, str] = None,
+                   blend_weight: float = None, **_) -> EvaluatorBackend:
+    # NumPy is only imported when this backend is chosen
+    from similarity_backend import TfidfBackend
+    return TfidfBackend(corpus, reference_answers, blend_weight)
+
+
+BACKENDS: Dict[str, Callable[..., Optional[EvaluatorBackend]]] = {
+    'gemini': _gemini_backend,
+    'stub': _stub_backend,
+    'tfidf': _tfidf_backend
+}
+
+
+def register_backend(name: str, factory: Callable[..., Optional[EvaluatorBackend]]):
+    BACKENDS[name] = factory
+
+
+def create_backend(name: str, **options) -> Optional[EvaluatorBackend]:
+    """
+    Build a registered backend. Returns None if it cannot run here
+    (e.g. gemini without an API key), leaving evaluation rule-based.
+    """
+    factory = BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown evaluator backend: {name} (available: {', '.join(sorted(BACKENDS))})")
+    return factory(**options)
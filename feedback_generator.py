@@ -1,23 +1,63 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from typing import List, Dict, Any
 from answer_evaluator import HybridEvaluator
-from questions_store import QuestionStorageAgent
+from evaluation_cache import EvaluationCache
+from evaluator_backends import create_backend
+from keyword_matcher import get_matcher
+from questions_store import load_storage_agent
+import metrics
 from datetime import datetime
 
 class FeedbackGenerator:
-    def __init__(self, api_key: str = None, storage_file: str = "dynamic_questions.json"):
-        self.evaluator = HybridEvaluator(api_key=api_key)
-        self.storage = QuestionStorageAgent(storage_file)
+    def __init__(self, api_key: str = None, storage_file: str = "dynamic_questions.json",
+                 max_workers: int = 4, eval_timeout: float = 30.0, model=None, cache: EvaluationCache = None,
+                 backend=None, blend_weight: float = None, storage=None):
+        """
+        backend: evaluator backend instance or name (gemini, stub, tfidf; see evaluator_backends);
+        by default Gemini when api_key is set. The tfidf backend is fitted on the stored questions.
+        blend_weight: overrides the named backend's share of the final score
+        storage: storage agent to record performance in; by default load_storage_agent(storage_file)
+        """
+        self.storage = storage or load_storage_agent(storage_file)
+        if isinstance(backend, str):
+            backend = create_backend(backend, api_key=api_key, blend_weight=blend_weight,
+                                     corpus=self.storage.get_questions_by_criteria())
+        self.evaluator = HybridEvaluator(api_key=api_key, model=model, cache=cache, backend=backend)
+        # Bounded pool shared by every bulk evaluation, so bursts stay within API quota
+        self.max_workers = max_workers
+        self.eval_timeout = eval_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="feedback")
 
     def generate_feedback_and_score(self, question: Dict, candidate_response: str) -> Dict[str, Any]:
         """
         Generate feedback and score for a single question-response pair
         """
-        result = self.evaluator.evaluate_comprehensive(question, candidate_response)
+        feedback_data = self.evaluate_response(question, candidate_response)
+
+        # Update question performance in storage
+        self.storage.update_question_performance(
+            question_id=question['id'],
+            score=feedback_data['score'],
+            outcome=feedback_data.get('outcome')
+        )
+        return feedback_data
+
+    def evaluate_response(self, question: Dict, candidate_response: str, result: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Score a question-response pair without touching storage.
+        result: evaluation already produced by the evaluator, if any
+        """
+        if result is None:
+            result = self.evaluator.evaluate_comprehensive(question, candidate_response)
 
         # --- Override scoring with keyword-based check ---
-        keywords = [kw.lower() for kw in question.get("keywords", [])]
-        answer_lower = candidate_response.lower()
-        matches = sum(1 for kw in keywords if kw in answer_lower)
+        # Reuse the evaluator's keyword scan; the response is only scanned again if it did not run
+        keywords = question.get("keywords", [])
+        matched = result.get('matched_keywords')
+        if matched is None:
+            matched = get_matcher(question).matched_keywords(candidate_response)
+        matches = len(matched)
 
         if keywords:
             ratio = matches / len(keywords)
@@ -31,13 +71,6 @@ class FeedbackGenerator:
                 result['score'] = 100
             result['evaluation_source'] = "keyword_based"
 
-        # Update question performance in storage
-        self.storage.update_question_performance(
-            question_id=question['id'],
-            score=result.get('score', 0),
-            outcome=result.get('outcome')
-        )
-
         feedback_data = {
             "question_id": question['id'],
             "question": question['question'],
@@ -45,19 +78,89 @@ class FeedbackGenerator:
             "score": result.get('score', 0),
             "overall_feedback": result.get('overall_feedback', ''),
             "evaluation_source": result.get('evaluation_source', ''),
+            "outcome": result.get('outcome'),
             "timestamp": datetime.now().isoformat()
         }
 
         return feedback_data
 
+    def record_feedback(self, feedback_list: List[Dict[str, Any]]):
+        """Commit the scores of a finished interview to storage in one batch"""
+        self.storage.update_questions_performance([
+            {
+                "question_id": feedback["question_id"],
+                "score": feedback["score"],
+                "outcome": feedback.get("outcome")
+            }
+            for feedback in feedback_list
+        ])
 
-    def generate_bulk_feedback(self, qa_pairs: List[Dict]) -> List[Dict[str, Any]]:
+    @metrics.timer("bulk_feedback_seconds", "Time to evaluate and record a whole interview")
+    def generate_bulk_feedback(self, qa_pairs: List[Dict], parallel: bool = True, batch: bool = True) -> List[Dict[str, Any]]:
         """
         Generate feedback for multiple question-response pairs
         qa_pairs: List of dicts with 'question' and 'response' keys
+        With AI enabled the whole set goes to the evaluator in one batched prompt; otherwise
+        pairs are evaluated concurrently. Results keep input order and storage is updated once at the end.
         """
+        if batch and self.evaluator.ai_enabled and len(qa_pairs) > 1:
+            feedback_list = self._evaluate_batched(qa_pairs)
+        elif parallel and self.max_workers > 1 and len(qa_pairs) > 1:
+            feedback_list = self._evaluate_parallel(qa_pairs)
+        else:
+            feedback_list = [self.evaluate_response(pair['question'], pair['response']) for pair in qa_pairs]
+        self.record_feedback(feedback_list)
+        return feedback_list
+
+    def _evaluate_batched(self, qa_pairs: List[Dict]) -> List[Dict[str, Any]]:
+        items = [(pair['question'], pair['response']) for pair in qa_pairs]
+        future = self._executor.submit(self.evaluator.evaluate_batch, items)
+        try:
+            results = future.result(timeout=self.eval_timeout)
+        except Exception:
+            # Batch reply too slow or failed outright: score every answer offline
+            future.cancel()
+            results = [self.evaluator.evaluate_rule_based(question, response) for question, response in items]
+        return [
+            self.evaluate_response(question, response, result)
+            for (question, response), result in zip(items, results)
+        ]
+
+    def _evaluate_parallel(self, qa_pairs: List[Dict]) -> List[Dict[str, Any]]:
+        submitted = time.monotonic()
+        started: Dict[int, float] = {}
+
+        def run(index: int, question: Dict, response: str) -> Dict[str, Any]:
+            started[index] = time.monotonic()
+            return self.evaluate_response(question, response)
+
+        futures = [
+            self._executor.submit(run, index, pair['question'], pair['response'])
+            for index, pair in enumerate(qa_pairs)
+        ]
         feedback_list = []
-        for pair in qa_pairs:
-            feedback = self.generate_feedback_and_score(pair['question'], pair['response'])
-            feedback_list.append(feedback)
+        for index, (pair, future) in enumerate(zip(qa_pairs, futures)):
+            try:
+                feedback_list.append(self._result_within_timeout(future, started, index, submitted))
+            except Exception:
+                # Slow or failed AI call: fall back to the offline score for this answer
+                future.cancel()
+                result = self.evaluator.evaluate_rule_based(pair['question'], pair['response'])
+                feedback_list.append(self.evaluate_response(pair['question'], pair['response'], result))
         return feedback_list
+
+    def _result_within_timeout(self, future, started: Dict[int, float], index: int, submitted: float) -> Dict[str, Any]:
+        """
+        Result of one call, allowed eval_timeout from when it started running, so a call
+        queued behind a slow one is not charged for the wait. A call still queued
+        eval_timeout after submission is given up on. Raises TimeoutError past the deadline.
+        """
+        while True:
+            begun = started.get(index)
+            deadline = (submitted if begun is None else begun) + self.eval_timeout
+            try:
+                return future.result(timeout=max(deadline - time.monotonic(), 0))
+            except TimeoutError:
+                if begun is not None or index not in started:
+                    raise
+                # Started while we waited for it to leave the queue: wait out its own budget
@@ -0,0 +1,138 @@
+import logging
+import random
+import threading
+import time
+from typing import Dict, Any, Callable
+
+import ai_providers
+
+logger = logging.getLogger(__name__)
+
+# Error class names raised by google-api-core / the SDK transports that are worth retrying
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+    "InternalServerError", "Aborted", "GatewayTimeout", "ConnectionError", "TimeoutError"
+}
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate-limit and transient transport errors; anything else fails immediately"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    if any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__):
+        return True
+    message = str(error)
+    return "429" in message or "503" in message
+
+
+class TokenBucket:
+    """Client-side rate limiter: `rate` requests per second with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class GeminiClient:
+    """
+    Long-lived model client owned by HybridEvaluator.
+    One GenerativeModel is created up front and reused, so the SDK keeps its
+    transport connection open across evaluations instead of rebuilding it per call.
+    Calls go through a token bucket and are retried with jittered exponential
+    backoff on rate-limit and transient errors.
+    """
+
+    def __init__(self, model=None, model_name: str = "gemini-1.5-flash",
+                 max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 rate_per_second: float = 2.0, burst: int = 5, model_factory: Callable[[], Any] = None):
+        """
+        model: ready-made model object (e.g. StubGenerativeModel)
+        model_factory: builds the model on the first call instead, so the SDK import is
+        deferred until an evaluation actually needs it; defaults to the Gemini provider
+        """
+        self._model = model
+        self._model_factory = model_factory or (lambda: ai_providers.create_model("gemini", model_name=model_name))
+        self._model_lock = threading.Lock()
+        self.model_name = getattr(model, "model_name", model_name)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limiter = TokenBucket(rate_per_second, burst)
+
+        self._stats_lock = threading.Lock()
+        self.calls = 0      # requests sent, including retries
+        self.errors = 0     # requests that raised
+        self.retries = 0
+        self.failures = 0   # generate() calls that gave up
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._model_factory()
+        return self._model
+
+    def generate(self, prompt: str) -> str:
+        """Send a prompt and return the reply text, retrying transient failures"""
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response_obj = self.model.generate_content(prompt)
+                text = response_obj.text.strip()
+            except Exception as e:
+                self._record(time.perf_counter() - started, failed=True)
+                if attempt >= self.max_retries or not is_retryable(e):
+                    with self._stats_lock:
+                        self.failures += 1
+                    logger.warning("Gemini call failed after %d attempt(s): %s", attempt + 1, e)
+                    raise
+                attempt += 1
+                with self._stats_lock:
+                    self.retries += 1
+                # Full jitter keeps a burst of finished interviews from retrying in lockstep
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                logger.info("Retrying Gemini call in %.2fs (attempt %d): %s", delay, attempt, e)
+                time.sleep(delay)
+                continue
+            self._record(time.perf_counter() - started, failed=False)
+            return text
+
+    def _record(self, latency: float, failed: bool):
+        with self._stats_lock:
+            self.calls += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            if failed:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'calls': self.calls,
+                'errors': self.errors,
+                'retries': self.retries,
+                'failures': self.failures,
+                'avg_latency': round(self.total_latency / self.calls, 4) if self.calls else 0.0,
+                'max_latency': round(self.max_latency, 4)
+            }
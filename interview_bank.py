@@ -1,17 +1,17 @@
 from question_bank_agent import QuestionBankAgent, QuestionGeneratorAgent
-from questions_store import QuestionStorageAgent
+from questions_store import load_storage_agent
 from answer_evaluator import HybridEvaluator
 from typing import List, Dict
 from datetime import datetime
 
 class InterviewAgent:
     def __init__(self, role: str, storage_file: str = "dynamic_questions.json", api_key: str = None):
-        # Initialize the question bank and generator
-        self.question_bank = QuestionBankAgent()
-        self.generator = QuestionGeneratorAgent(self.question_bank)
-        
         # Storage agent to track questions and performance
-        self.storage_agent = QuestionStorageAgent(storage_file)
+        self.storage_agent = load_storage_agent(storage_file)
+        
+        # Initialize the question bank and generator (templates are registered in this store)
+        self.question_bank = QuestionBankAgent()
+        self.generator = QuestionGeneratorAgent(self.question_bank, self.storage_agent)
         
         # Evaluator for AI-based evaluation
         self.evaluator = HybridEvaluator(api_key=api_key)
@@ -27,7 +27,8 @@ class InterviewAgent:
         for q in questions:
             if not self.storage_agent.get_question_by_id(q['id']):
                 q['target_roles'] = [self.role]
-                self.storage_agent.store_question(q)
+                # The store may already hold the same text under another id; track that record
+                q['id'] = self.storage_agent.store_question(q)
         
         self.current_session = questions
         return questions
@@ -51,11 +52,21 @@ class InterviewAgent:
         return eval_result
     
     def evaluate_session(self, responses: Dict[int, str]) -> List[Dict]:
-        """Evaluate multiple responses in one session"""
-        results = []
+        """Evaluate multiple responses in one session with a single batched evaluation"""
+        items = []
         for qid, response in responses.items():
-            result = self.evaluate_response(qid, response)
-            results.append(result)
+            question = self.storage_agent.get_question_by_id(qid)
+            if not question:
+                raise ValueError(f"Question ID {qid} not found.")
+            items.append((question, response))
+        
+        results = self.evaluator.evaluate_batch(items)
+        
+        # Update question performance for the whole session at once
+        self.storage_agent.update_questions_performance([
+            {'question_id': question['id'], 'score': result['score'], 'outcome': result.get('outcome')}
+            for (question, _), result in zip(items, results)
+        ])
         return results
     
     def get_session_summary(self) -> Dict:
@@ -1,10 +1,12 @@
+import argparse
 import random
 from datetime import datetime
 from typing import Dict, List
 
 from question_bank_agent import QuestionBankAgent, QuestionGeneratorAgent
-from questions_store import QuestionStorageAgent
+from questions_store import load_storage_agent
 from answer_evaluator import HybridEvaluator
+import profiling
 
 class InterviewOrchestrator:
     def __init__(self, role: str, api_key: str = None):
@@ -12,11 +14,12 @@ class InterviewOrchestrator:
         self.role = role
         
         # Initialize components
+        self.storage = load_storage_agent()
         self.question_bank = QuestionBankAgent()
-        self.generator = QuestionGeneratorAgent(self.question_bank)
-        self.storage = QuestionStorageAgent()
+        self.generator = QuestionGeneratorAgent(self.question_bank, self.storage)
         self.evaluator = HybridEvaluator(api_key=api_key)
     
+    @profiling.profiled("conduct_interview")
     def conduct_interview(self, num_questions: int = 6) -> Dict:
         """Generate questions, evaluate responses, store performance"""
         
@@ -58,6 +61,14 @@ class InterviewOrchestrator:
         return self.storage.get_best_questions(self.role, count=count)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a mock interview in the terminal")
+    parser.add_argument("--profile", action="store_true",
+                        help="write a cProfile of the interview and a hot-function report (same as PROFILE=1)")
+    parser.add_argument("--profile-dir", default=None, help="where profiles go (default: profiles/ or PROFILE_DIR)")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable(directory=args.profile_dir)
+
     print("=== Interview Orchestrator ===")
     role = input("Enter candidate role (finance/operations/data_analytics): ").strip()
     
@@ -0,0 +1,92 @@
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a question's keywords.
+    A response is lowercased once and scanned in a single pass, reporting every
+    (possibly overlapping) occurrence of every keyword, e.g. both SUM and SUMIF in "=SUMIF(".
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = list(keywords)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._empty: List[int] = []
+        self._lengths: List[int] = []
+
+        for index, keyword in enumerate(self.keywords):
+            pattern = keyword.lower()
+            self._lengths.append(len(pattern))
+            if not pattern:
+                # `"" in text` is always true; keep that behaviour
+                self._empty.append(index)
+                continue
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(index)
+
+        # Breadth-first failure links; outputs of the fallback state are inherited
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str, word_boundary: bool = False) -> Dict[int, List[int]]:
+        """
+        Map keyword index -> start positions (in the lowercased text) of its matches.
+        word_boundary: only count matches not embedded in a longer word
+        """
+        text = (text or "").lower()
+        matches: Dict[int, List[int]] = {index: [0] for index in self._empty}
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                end = position + 1
+                start = end - self._lengths[index]
+                if word_boundary and not self._on_boundary(text, start, end):
+                    continue
+                matches.setdefault(index, []).append(start)
+        return matches
+
+    def matched_keywords(self, text: str, word_boundary: bool = False) -> List[str]:
+        """Keywords (in question order) that occur in the text"""
+        matches = self.scan(text, word_boundary)
+        return [keyword for index, keyword in enumerate(self.keywords) if index in matches]
+
+    @staticmethod
+    def _on_boundary(text: str, start: int, end: int) -> bool:
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        return not (before.isalnum() or before == "_") and not (after.isalnum() or after == "_")
+
+
+@lru_cache(maxsize=4096)
+def _compiled(question_id: Any, keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(list(keywords))
+
+
+def get_matcher(question: Dict[str, Any]) -> KeywordMatcher:
+    """Matcher for a question, built once and cached on its id (and keyword list)"""
+    return _compiled(question.get('id'), tuple(question.get('keywords', [])))
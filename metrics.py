@@ -0,0 +1,233 @@
+import functools
+import os
+import threading
+import time
+from typing import Dict, List, Any, Tuple
+
+# Off unless METRICS_ENABLED is set; while off every timer/counter call returns straight away
+_enabled = os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "yes", "on")
+
+# Histogram bucket bounds in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = "interviewer_"
+
+_registry: Dict[Tuple[str, Tuple], Any] = {}
+_help: Dict[str, str] = {}
+_registry_lock = threading.Lock()
+
+
+def enable(flag: bool = True):
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _format_labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Counter:
+    """Monotonic count (calls, errors, fallbacks)"""
+
+    def __init__(self, name: str, labels: Tuple = ()):
+        self.name = name
+        self.labels = labels
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        if not _enabled:
+            return
+        with self._lock:
+            self.value += amount
+
+    def __call__(self, fn):
+        """Decorator: count every call of fn"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _enabled:
+                self.inc()
+            return fn(*args, **kwargs)
+        return wrapper
+
+    def reset(self):
+        with self._lock:
+            self.value = 0.0
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels)} {self.value:g}"]
+
+
+class _NullTiming:
+    """Shared no-op context manager handed out while metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMING = _NullTiming()
+
+
+class _Timing:
+    def __init__(self, timer: "Timer"):
+        self.timer = timer
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.observe(time.perf_counter() - self.started)
+        return False
+
+
+class Timer:
+    """Latency histogram (seconds); use as a decorator or `with timer.time():`"""
+
+    def __init__(self, name: str, labels: Tuple = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def observe(self, seconds: float):
+        if not _enabled:
+            return
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+
+    def time(self):
+        return _Timing(self) if _enabled else _NULL_TIMING
+
+    def __call__(self, fn):
+        """Decorator: time every call of fn (including calls that raise)"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.observe(time.perf_counter() - started)
+        return wrapper
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+            self.bucket_counts = [0] * len(self.buckets)
+
+    def render(self) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, hits in zip(self.buckets, self.bucket_counts):
+            cumulative += hits
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels + (('le', f'{bound:g}'),))} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(self.labels + (('le', '+Inf'),))} {self.count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels)} {self.total:g}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels)} {self.count}")
+        return lines
+
+
+def _get(kind, name: str, help_text: str, labels: Dict[str, str]):
+    name = PREFIX + name
+    key = (name, tuple(sorted(labels.items())))
+    with _registry_lock:
+        metric = _registry.get(key)
+        if metric is None:
+            metric = _registry[key] = kind(name, key[1])
+            _help.setdefault(name, help_text)
+        elif not isinstance(metric, kind):
+            raise ValueError(f"Metric {name} is already registered as a {type(metric).__name__}")
+    return metric
+
+
+def counter(name: str, help_text: str = "", **labels) -> Counter:
+    """Get or create a counter; the same name and labels always return the same object"""
+    return _get(Counter, name, help_text, labels)
+
+
+def timer(name: str, help_text: str = "", **labels) -> Timer:
+    """Get or create a latency timer; the same name and labels always return the same object"""
+    return _get(Timer, name, help_text, labels)
+
+
+def snapshot() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: (m.name, m.labels))
+    lines = []
+    for i, metric in enumerate(metrics):
+        if i == 0 or metrics[i - 1].name != metric.name:
+            if _help.get(metric.name):
+                lines.append(f"# HELP {metric.name} {_help[metric.name]}")
+            lines.append(f"# TYPE {metric.name} {'counter' if isinstance(metric, Counter) else 'histogram'}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def summary() -> List[Dict[str, Any]]:
+    """One row per metric, for display (e.g. the app sidebar)"""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: (m.name, m.labels))
+    rows = []
+    for metric in metrics:
+        row = {'metric': metric.name[len(PREFIX):] + _format_labels(metric.labels)}
+        if isinstance(metric, Counter):
+            row.update({'count': metric.value, 'mean_ms': None, 'max_ms': None})
+        else:
+            row.update({
+                'count': metric.count,
+                'mean_ms': round(metric.total / metric.count * 1000, 2) if metric.count else None,
+                'max_ms': round(metric.max * 1000, 2) if metric.count else None
+            })
+        rows.append(row)
+    return rows
+
+
+def reset():
+    """Zero every metric (registrations are kept)"""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    for metric in metrics:
+        metric.reset()
+
+
+def start_http_server(port: int, host: str = "0.0.0.0"):
+    """Serve snapshot() to Prometheus scrapers from a daemon thread"""
+    # Imported here: http.server pulls in the email package, which the hot paths never need
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = snapshot().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
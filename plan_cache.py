@@ -0,0 +1,125 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class InterviewPlanCache:
+    """
+    Pool of ready-made interview question sets per (role, count).
+    Plans are built by QuestionGeneratorAgent.generate_interview_questions on a
+    background thread, so starting an interview is a pop from a deque.
+    A role's pooled plans are dropped and rebuilt when one of its questions is
+    stored or deleted, when the bank is reloaded from disk, or once the
+    effectiveness scores of its questions have drifted by more than
+    drift_threshold in total since the plans were built.
+    """
+
+    def __init__(self, generator, storage, pool_size: int = 3, drift_threshold: float = 0.1):
+        self.generator = generator
+        self.storage = storage
+        self.pool_size = pool_size
+        self.drift_threshold = drift_threshold
+        self.hits = 0
+        self.misses = 0
+        self._pools: Dict[Tuple[str, int], deque] = {}
+        self._generation: Dict[str, int] = {}   # bumped on every invalidation of a role
+        self._drift: Dict[str, float] = {}
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plan-cache")
+        storage.add_listener(self._on_store_change)
+
+    def warm(self, roles: Iterable[str], count: int):
+        """Start building plans for the given roles in the background"""
+        for role in roles:
+            self._schedule_refill((role, count))
+
+    def pop(self, role: str, count: int) -> List[Dict]:
+        """Take a prepared plan, or generate one now if the pool is empty"""
+        key = (role, count)
+        with self._lock:
+            pool = self._pools.get(key)
+            plan = pool.popleft() if pool else None
+            if plan is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self._schedule_refill(key)
+        if plan is None:
+            plan = self.generator.generate_interview_questions(role=role, count=count)
+        return plan
+
+    def invalidate(self, roles: Optional[Iterable[str]] = None):
+        """Drop pooled plans for the given roles (all roles if None) and rebuild them"""
+        with self._lock:
+            if roles is None:
+                roles = {role for role, _ in self._pools}
+            keys = []
+            for role in set(roles):
+                self._generation[role] = self._generation.get(role, 0) + 1
+                self._drift[role] = 0.0
+                for key, pool in self._pools.items():
+                    if key[0] == role:
+                        pool.clear()
+                        keys.append(key)
+        for key in keys:
+            self._schedule_refill(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'pooled': {f"{role}/{count}": len(pool) for (role, count), pool in self._pools.items()}
+            }
+
+    def _on_store_change(self, event: str, question: Optional[Dict], previous_effectiveness: float):
+        if event == "reload":
+            self.invalidate()
+            return
+        roles = question.get('target_roles', [])
+        if event != "update":
+            self.invalidate(roles)
+            return
+        delta = abs(question.get('effectiveness_score', 0) - (previous_effectiveness or 0))
+        if not delta:
+            return
+        with self._lock:
+            stale = []
+            for role in roles:
+                self._drift[role] = self._drift.get(role, 0.0) + delta
+                if self._drift[role] > self.drift_threshold:
+                    stale.append(role)
+        if stale:
+            self.invalidate(stale)
+
+    def _schedule_refill(self, key: Tuple[str, int]):
+        with self._lock:
+            if key in self._refilling or len(self._pools.get(key, ())) >= self.pool_size:
+                return
+            self._refilling.add(key)
+        self._executor.submit(self._refill, key)
+
+    def _refill(self, key: Tuple[str, int]):
+        role, count = key
+        try:
+            while True:
+                with self._lock:
+                    pool = self._pools.setdefault(key, deque())
+                    if len(pool) >= self.pool_size:
+                        return
+                    generation = self._generation.get(role, 0)
+                plan = self.generator.generate_interview_questions(role=role, count=count)
+                with self._lock:
+                    # A plan built while the role was being invalidated may already be stale
+                    if self._generation.get(role, 0) == generation:
+                        pool.append(plan)
+        except Exception as e:
+            logger.warning("Refilling interview plans for %s failed: %s", role, e)
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
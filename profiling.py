@@ -0,0 +1,113 @@
+import cProfile
+import functools
+import io
+import itertools
+import logging
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Off unless PROFILE is set (or enable() is called, e.g. by a --profile flag)
+_enabled = os.getenv("PROFILE", "").lower() in ("1", "true", "yes", "on")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+TOP_N = int(os.getenv("PROFILE_TOP_N", "30"))     # functions listed in each report
+WINDOW = int(os.getenv("PROFILE_WINDOW", "50"))   # most recent runs kept (and aggregated) per label
+
+# One profiled run at a time: cProfile cannot nest, and on Python 3.12+ it is process-wide
+_active = threading.Lock()
+_runs: Dict[str, deque] = {}
+_runs_lock = threading.Lock()
+_sequence = itertools.count(1)
+
+
+def enable(directory: Optional[str] = None, top_n: Optional[int] = None, window: Optional[int] = None):
+    global _enabled, PROFILE_DIR, TOP_N, WINDOW
+    _enabled = True
+    PROFILE_DIR = directory or PROFILE_DIR
+    TOP_N = top_n or TOP_N
+    WINDOW = window or WINDOW
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+@contextmanager
+def profile(label: str):
+    """
+    Run the block under cProfile when profiling is enabled.
+    Each run is written to PROFILE_DIR/<label>-<time>-<pid>-<n>.prof and the
+    hot-function report PROFILE_DIR/<label>-top.txt is rebuilt from the last WINDOW runs.
+    A block entered while another profiled run is in progress runs unprofiled.
+    """
+    if not _enabled or not _active.acquire(blocking=False):
+        yield
+        return
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        # Also reached through st.stop()/st.rerun(), which end a Streamlit run by raising
+        profiler.disable()
+        _active.release()
+        _record(label, profiler, time.perf_counter() - started)
+
+
+def profiled(label: str = None):
+    """Decorator form of profile(); label defaults to the function's qualified name"""
+    def decorator(fn):
+        name = label or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with profile(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _record(label: str, profiler: cProfile.Profile, elapsed: float):
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(PROFILE_DIR, f"{label}-{stamp}-{os.getpid()}-{next(_sequence)}.prof")
+        profiler.dump_stats(path)
+        with _runs_lock:
+            runs = _runs.setdefault(label, deque())
+            runs.append((path, elapsed))
+            while len(runs) > WINDOW:
+                old_path, _ = runs.popleft()
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+            _write_report(label, list(runs))
+    except Exception as e:
+        logger.warning("Could not write profile for %s: %s", label, e)
+
+
+def _write_report(label: str, runs):
+    """Top functions over the given runs, by cumulative and by own time"""
+    paths = [path for path, _ in runs if os.path.exists(path)]
+    if not paths:
+        return
+    timings = sorted(elapsed * 1000 for _, elapsed in runs)
+    buffer = io.StringIO()
+    stats = pstats.Stats(*paths, stream=buffer).strip_dirs()
+    buffer.write(f"Hot functions for {label}: last {len(runs)} runs, generated {datetime.now().isoformat()}\n")
+    buffer.write(f"Wall time per run: mean {sum(timings) / len(timings):.1f} ms, "
+                 f"median {timings[len(timings) // 2]:.1f} ms, max {timings[-1]:.1f} ms\n")
+    for sort_key, title in (("cumulative", "by cumulative time"), ("tottime", "by own time")):
+        buffer.write(f"\n=== Top {TOP_N} {title} ===\n")
+        stats.sort_stats(sort_key).print_stats(TOP_N)
+    with open(os.path.join(PROFILE_DIR, f"{label}-top.txt"), "w", encoding="utf-8") as f:
+        f.write(buffer.getvalue())
@@ -1,9 +1,11 @@
+import itertools
 import json
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from datetime import datetime
 
-from questions_store import QuestionStorageAgent, load_storage_agent
+from questions_store import load_storage_agent, content_question_id
+import metrics
 
 class QuestionBankAgent:
     def __init__(self):
@@ -23,6 +25,11 @@ class QuestionBankAgent:
         }
 
         self.initialize_base_questions()
+        # Every template expanded once, by (category, difficulty); see expand_templates
+        self.template_catalogue: Dict[Tuple[str, str], List[Dict]] = {}
+        for question in self.expand_templates():
+            key = (question['category'], question['difficulty'])
+            self.template_catalogue.setdefault(key, []).append(question)
 
     def initialize_base_questions(self):
         """Create foundational question templates"""
@@ -30,12 +37,29 @@ class QuestionBankAgent:
             {
                 "template": "What function would you use to {action} in Excel?",
                 "variations": {"action": ["sum values in a range", "find the average", "count non-empty cells"]},
+                "references": {"action": {
+                    "sum values in a range": "Use the SUM function, e.g. =SUM(A1:A10); AutoSum (Alt+=) inserts it "
+                                             "and blank or text cells are ignored.",
+                    "find the average": "Use the AVERAGE function, e.g. =AVERAGE(B2:B20), which ignores blank and "
+                                        "text cells; AVERAGEIF averages only the cells meeting a condition.",
+                    "count non-empty cells": "Use the COUNTA function, e.g. =COUNTA(A1:A100); COUNT counts only "
+                                             "numbers and COUNTBLANK counts the empty cells."
+                }},
                 "category": "basic_formulas",
                 "difficulty": "basic"
             },
             {
                 "template": "How would you {task} in a large dataset?",
                 "variations": {"task": ["remove duplicates", "find unique values", "filter specific criteria"]},
+                "references": {"task": {
+                    "remove duplicates": "Use Data > Remove Duplicates and tick the key columns, or Advanced Filter "
+                                         "with unique records only; the UNIQUE function keeps the source intact.",
+                    "find unique values": "Use the UNIQUE function, e.g. =UNIQUE(A2:A1000), Advanced Filter with "
+                                          "unique records only, or a PivotTable listing each distinct item.",
+                    "filter specific criteria": "Format the range as a table and use AutoFilter, Advanced Filter with "
+                                                "a criteria range, or the FILTER function, e.g. "
+                                                "=FILTER(A2:D1000, C2:C1000>100)."
+                }},
                 "category": "data_analysis",
                 "difficulty": "intermediate"
             },
@@ -43,21 +67,94 @@ class QuestionBankAgent:
                 "template": "Explain the difference between {concept1} and {concept2}.",
                 "variations": {"concept1": ["VLOOKUP", "absolute references", "SUMIF"],
                                "concept2": ["INDEX-MATCH", "relative references", "SUMIFS"]},
+                "references": {
+                    "concept1": {
+                        "VLOOKUP": "VLOOKUP searches the first column of a table and returns a column to its right "
+                                   "by index number, so it cannot look left; use exact match (FALSE).",
+                        "absolute references": "Absolute references such as $A$1 stay fixed when the formula is "
+                                               "copied, because the dollar signs lock the column and row.",
+                        "SUMIF": "SUMIF adds the cells of a sum range whose criteria range meets one condition, "
+                                 "e.g. =SUMIF(A:A, \"East\", C:C)."
+                    },
+                    "concept2": {
+                        "INDEX-MATCH": "INDEX-MATCH uses MATCH to find the position and INDEX to return the value "
+                                       "from any column, so it can look left and survives inserted columns.",
+                        "relative references": "Relative references such as A1 shift with the formula when it is "
+                                               "copied down or across.",
+                        "SUMIFS": "SUMIFS takes the sum range first and then several criteria range and condition "
+                                  "pairs, all of which must be met."
+                    }
+                },
                 "category": "advanced_formulas",
                 "difficulty": "advanced"
             }
         ]
 
+    def expand_templates(self) -> List[Dict]:
+        """
+        Expand every template into the Cartesian product of its variations.
+        Each question gets a content-addressed id, its keywords, a reference
+        answer built from the references of its variation values, and the roles
+        whose focus includes its category, so it can be stored and tracked
+        like a seed question.
+        """
+        expanded = []
+        for template in self.base_questions:
+            keys = list(template['variations'])
+            target_roles = [role for role, categories in self.role_focus.items()
+                            if template['category'] in categories]
+            for values in itertools.product(*(template['variations'][key] for key in keys)):
+                question_text = self._fill_template(template, dict(zip(keys, values)))
+                reference_answer = " ".join(
+                    template.get('references', {}).get(key, {}).get(value, "") for key, value in zip(keys, values)
+                ).strip()
+                expanded.append({
+                    "id": content_question_id(question_text),
+                    "question": question_text,
+                    "type": "formula" if "function" in question_text.lower() else "concept",
+                    "category": template['category'],
+                    "difficulty": template['difficulty'],
+                    "keywords": self._extract_keywords(question_text),
+                    "reference_answer": reference_answer,
+                    "target_roles": target_roles,
+                    "generated": True
+                })
+        return expanded
+
+    def register_templates(self, storage):
+        """
+        Bulk-load the template catalogue into storage (known questions are left as they are)
+        and adopt the stored ids, so template questions take part in effectiveness tracking
+        """
+        questions = [q for qs in self.template_catalogue.values() for q in qs]
+        for question, stored_id in zip(questions, storage.store_questions([dict(q) for q in questions])):
+            question['id'] = stored_id
+
+    @staticmethod
+    def _fill_template(template: Dict, values: Dict[str, str]) -> str:
+        question_text = template['template']
+        for key, value in values.items():
+            question_text = question_text.replace(f"{{{key}}}", value)
+        return question_text
+
+    @staticmethod
+    def _extract_keywords(question_text: str) -> List[str]:
+        return [word for word in question_text.split() if word.isupper()]
+
 
 class QuestionGeneratorAgent:
-    def __init__(self, question_bank: QuestionBankAgent):
+    def __init__(self, question_bank: QuestionBankAgent, storage=None):
         self.question_bank = question_bank
-        self.used_questions = set()
         self.difficulty_progression = ["basic", "intermediate", "advanced"]
+        self.storage = storage or load_storage_agent("dynamic_questions.json")
+        self.question_bank.register_templates(self.storage)
 
+    @metrics.timer("generate_interview_seconds", "Time to assemble one interview's questions")
     def generate_interview_questions(self, role: str, count: int = 6) -> List[Dict]:
         """Generate personalized questions for a role with guaranteed count"""
         questions = []
+        # Tracked per call so one generator can serve concurrent sessions
+        used_questions = set()
         categories = self.question_bank.role_focus.get(role, ["basic_formulas"])
 
         # Balanced difficulty allocation
@@ -71,76 +168,50 @@ class QuestionGeneratorAgent:
 
         for difficulty, num_questions in difficulty_distribution.items():
             for _ in range(num_questions):
-                question = self._generate_single_question(categories, difficulty)
+                question = self._generate_single_question(categories, difficulty, used_questions)
                 if not question:
-                    question = self._fallback_from_storage(categories, difficulty)
-                if question and question['id'] not in self.used_questions:
+                    question = self._fallback_from_storage(categories, difficulty, used_questions)
+                if question and question['id'] not in used_questions:
                     questions.append(question)
-                    self.used_questions.add(question['id'])
+                    used_questions.add(question['id'])
 
         # Final fallback: fill remaining slots ignoring difficulty/category
         if len(questions) < count:
             needed = count - len(questions)
-            storage = QuestionStorageAgent()
-            extra = storage.get_questions_by_criteria(role=role, count=needed)
-            for q in extra:
-                if q['id'] not in self.used_questions:
-                    questions.append(q)
-                    self.used_questions.add(q['id'])
-
-        # Reset used_questions to allow future interviews to regenerate all
-        self.used_questions.clear()
+            # Weighted by effectiveness, so the whole role's bank gets asked, not just its top few
+            for q in self.storage.sample_questions(role=role, count=needed, exclude=used_questions):
+                questions.append(q)
+                used_questions.add(q['id'])
 
         return questions[:count]
 
-    def _fallback_from_storage(self, categories, difficulty):
-        """Pull multiple questions from storage if template fails"""
-        storage = load_storage_agent("dynamic_questions.json")
-        qs = storage.get_questions_by_criteria(
+    def _fallback_from_storage(self, categories, difficulty, used_questions):
+        """Draw a stored question (weighted by effectiveness) if template fails"""
+        qs = self.storage.sample_questions(
             category=random.choice(categories),
             difficulty=difficulty,
-            count=3  # fetch multiple to avoid shortage
+            count=1,
+            exclude=used_questions
         )
-        for q in qs:
-            if q['id'] not in self.used_questions:
-                return q
-        return None
+        return qs[0] if qs else None
 
-    def _generate_single_question(self, categories: List[str], difficulty: str) -> Dict:
+    def _generate_single_question(self, categories: List[str], difficulty: str, used_questions: set = None) -> Dict:
         """Generate a single question based on parameters"""
         if random.choice([True, False]):
-            return self._use_template_question(categories, difficulty)
+            return self._use_template_question(categories, difficulty, used_questions or set())
         else:
             return self._get_curated_question(categories, difficulty)
 
-    def _use_template_question(self, categories: List[str], difficulty: str) -> Dict:
-        suitable_templates = [
-            t for t in self.question_bank.base_questions
-            if t['category'] in categories and t['difficulty'] == difficulty
+    def _use_template_question(self, categories: List[str], difficulty: str, used_questions: set) -> Dict:
+        """Sample an expanded template question from the catalogue; no template is filled here"""
+        catalogue = self.question_bank.template_catalogue
+        suitable = [
+            q for category in categories for q in catalogue.get((category, difficulty), [])
+            if q['id'] not in used_questions
         ]
-        if not suitable_templates:
+        if not suitable:
             return None
-        template = random.choice(suitable_templates)
-        question_text = self._fill_template(template)
-        return {
-            "id": hash(question_text) % 10000,
-            "question": question_text,
-            "type": "formula" if "function" in question_text.lower() else "concept",
-            "category": template['category'],
-            "difficulty": difficulty,
-            "keywords": self._extract_keywords(question_text),
-            "generated": True,
-            "timestamp": datetime.now().isoformat()
-        }
-
-    def _fill_template(self, template: Dict) -> str:
-        question_text = template['template']
-        for key, options in template['variations'].items():
-            question_text = question_text.replace(f"{{{key}}}", random.choice(options))
-        return question_text
-
-    def _extract_keywords(self, question_text: str) -> List[str]:
-        return [word for word in question_text.split() if word.isupper()]
+        return {**random.choice(suitable), "timestamp": datetime.now().isoformat()}
 
     def _get_curated_question(self, categories: List[str], difficulty: str) -> Dict:
         """Currently not implemented, could fetch curated questions"""
@@ -0,0 +1,293 @@
+import hashlib
+import random
+import re
+from bisect import bisect_left, insort
+from itertools import chain, islice
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Set, Tuple
+
+from weighted_sampler import WeightedSampler
+
+# Content-addressed ids have this bit set, keeping them clear of sequential ids (1, 2, 3, ...)
+CONTENT_ID_BASE = 1 << 47
+
+
+def normalise_question_text(text: str) -> str:
+    """Case- and whitespace-insensitive form of a question, used for dedup and content ids"""
+    return re.sub(r"\s+", " ", (text or "")).strip().casefold()
+
+
+def matches_facets(question: Dict, category: Optional[str], difficulty: Optional[str], role: Optional[str]) -> bool:
+    """True if the question passes the category/difficulty/role filter (None matches anything)"""
+    return ((not category or question.get('category') == category)
+            and (not difficulty or question.get('difficulty') == difficulty)
+            and (not role or role in question.get('target_roles', [])))
+
+
+def content_question_id(text: str) -> int:
+    """
+    Stable id derived from the question text: a 47-bit BLAKE2b digest of the
+    normalised text, offset by CONTENT_ID_BASE. Unlike hash(), it is the same in
+    every process, and it stays below 2**53 so it round-trips through JSON.
+    """
+    digest = hashlib.blake2b(normalise_question_text(text).encode("utf-8"), digest_size=6).digest()
+    return CONTENT_ID_BASE | (int.from_bytes(digest, "big") & (CONTENT_ID_BASE - 1))
+
+
+class SortedList:
+    """
+    Sorted sequence kept as a list of sorted buckets of at most 2 * load items, with
+    each bucket's last item in `maxes` (the layout sortedcontainers.SortedList uses).
+    add and remove bisect `maxes`, then shift items within one bucket only, so an
+    update costs O(log n + load) instead of the O(n) of a single flat list.
+    Iteration is in order; items must be unique for remove to find the right one.
+    """
+
+    def __init__(self, items: Iterable = (), load: int = 500):
+        self.load = load
+        items = sorted(items)
+        self._buckets: List[list] = [items[i:i + load] for i in range(0, len(items), load)]
+        self._maxes: List = [bucket[-1] for bucket in self._buckets]
+        self._len = len(items)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        return chain.from_iterable(self._buckets)
+
+    def add(self, item):
+        if not self._buckets:
+            self._buckets.append([item])
+            self._maxes.append(item)
+        else:
+            position = bisect_left(self._maxes, item)
+            if position == len(self._maxes):
+                position -= 1
+                self._buckets[position].append(item)
+                self._maxes[position] = item
+            else:
+                insort(self._buckets[position], item)
+            bucket = self._buckets[position]
+            if len(bucket) > 2 * self.load:
+                self._buckets.insert(position + 1, bucket[self.load:])
+                del bucket[self.load:]
+                self._maxes.insert(position, bucket[-1])
+        self._len += 1
+
+    def remove(self, item):
+        """Remove item; raises ValueError if it is not present"""
+        position = bisect_left(self._maxes, item)
+        if position == len(self._maxes):
+            raise ValueError(f"{item!r} not in list")
+        bucket = self._buckets[position]
+        index = bisect_left(bucket, item)
+        if bucket[index] != item:
+            raise ValueError(f"{item!r} not in list")
+        del bucket[index]
+        self._len -= 1
+        if not bucket:
+            del self._buckets[position]
+            del self._maxes[position]
+            return
+        self._maxes[position] = bucket[-1]
+        # Merge a bucket that fell below load / 2 into its neighbour, so bucket count stays O(n / load)
+        if len(bucket) < self.load // 2 and len(self._buckets) > 1:
+            if position == 0:
+                position = 1
+            self._buckets[position - 1].extend(self._buckets.pop(position))
+            del self._maxes[position - 1]
+            merged = self._buckets[position - 1]
+            if len(merged) > 2 * self.load:
+                self._buckets.insert(position, merged[self.load:])
+                del merged[self.load:]
+                self._maxes.insert(position - 1, merged[-1])
+
+
+class QuestionIndex:
+    """
+    Secondary indexes over the question bank:
+    - id -> question
+    - (category, difficulty) -> ids
+    - role -> ids
+    - normalised question text -> id (dedup)
+    - effectiveness-ordered ranking (highest first, insertion order on ties)
+    - effectiveness-weighted samplers, one per (category, difficulty, role) filter,
+      built the first time that filter is sampled and kept current afterwards
+    - running totals for analytics (usage, effectiveness, category/difficulty counts)
+    """
+
+    def __init__(self, questions: Iterable[Dict] = ()):
+        self.rebuild(questions)
+
+    def rebuild(self, questions: Iterable[Dict]):
+        """Drop all indexes and rebuild them from the given questions"""
+        self.by_id: Dict[Any, Dict] = {}
+        self.by_facet: Dict[Tuple[str, str], Set[Any]] = {}
+        self.by_role: Dict[str, Set[Any]] = {}
+        self.by_text: Dict[str, Any] = {}
+        self._ranking = SortedList()   # (-effectiveness, insertion seq, id) keys
+        self._rank_keys: Dict[Any, Tuple[float, int, Any]] = {}
+        self._samplers: Dict[Tuple[Optional[str], Optional[str], Optional[str]], WeightedSampler] = {}
+        self._seq = 0
+        self.total_usage = 0
+        self.effectiveness_total = 0.0
+        self.category_counts: Dict[str, int] = {}
+        self.difficulty_counts: Dict[str, int] = {}
+        self._counted: Dict[Any, Tuple[int, float]] = {}   # id -> (usage, effectiveness) in the totals
+        for question in questions:
+            self.add(question)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, question_id) -> bool:
+        return question_id in self.by_id
+
+    def get(self, question_id) -> Optional[Dict]:
+        return self.by_id.get(question_id)
+
+    def add(self, question: Dict):
+        """Index a question; the first question stored under an id wins, as with a linear scan"""
+        question_id = question['id']
+        if question_id in self.by_id:
+            return
+        self.by_id[question_id] = question
+        facet = (question.get('category'), question.get('difficulty'))
+        self.by_facet.setdefault(facet, set()).add(question_id)
+        for role in question.get('target_roles', []):
+            self.by_role.setdefault(role, set()).add(question_id)
+        self.by_text.setdefault(normalise_question_text(question.get('question')), question_id)
+
+        key = (-question.get('effectiveness_score', 0), self._seq, question_id)
+        self._seq += 1
+        self._ranking.add(key)
+        self._rank_keys[question_id] = key
+        for facets, sampler in self._samplers.items():
+            if matches_facets(question, *facets):
+                sampler.set(question_id, question.get('effectiveness_score', 0))
+
+        self._count(self.category_counts, question.get('category', 'unknown'), 1)
+        self._count(self.difficulty_counts, question.get('difficulty', 'unknown'), 1)
+        self._counted[question_id] = (0, 0.0)
+        self._refresh_totals(question)
+
+    def remove(self, question_id) -> Optional[Dict]:
+        """Remove a question from every index and return it"""
+        question = self.by_id.pop(question_id, None)
+        if question is None:
+            return None
+        facet = (question.get('category'), question.get('difficulty'))
+        self._discard(self.by_facet, facet, question_id)
+        for role in question.get('target_roles', []):
+            self._discard(self.by_role, role, question_id)
+        text = normalise_question_text(question.get('question'))
+        if self.by_text.get(text) == question_id:
+            del self.by_text[text]
+
+        key = self._rank_keys.pop(question_id)
+        self._ranking.remove(key)
+        for sampler in self._samplers.values():
+            sampler.remove(question_id)
+
+        self._count(self.category_counts, question.get('category', 'unknown'), -1)
+        self._count(self.difficulty_counts, question.get('difficulty', 'unknown'), -1)
+        usage, effectiveness = self._counted.pop(question_id)
+        self.total_usage -= usage
+        self.effectiveness_total -= effectiveness
+        return question
+
+    def reindex_effectiveness(self, question: Dict):
+        """Move a question to its new rank and update the totals after its statistics changed"""
+        question_id = question['id']
+        old_key = self._rank_keys.get(question_id)
+        if old_key is None:
+            return
+        self._refresh_totals(question)
+        new_score = -question.get('effectiveness_score', 0)
+        if old_key[0] == new_score:
+            return
+        self._ranking.remove(old_key)
+        new_key = (new_score, old_key[1], question_id)
+        self._ranking.add(new_key)
+        self._rank_keys[question_id] = new_key
+        for sampler in self._samplers.values():
+            if question_id in sampler:
+                sampler.set(question_id, question.get('effectiveness_score', 0))
+
+    def top(self, k: int) -> List[Dict]:
+        """The k most effective questions, read off the front of the ranking in O(k)"""
+        return [self.by_id[question_id] for _, _, question_id in islice(self._ranking, k)]
+
+    def _refresh_totals(self, question: Dict):
+        usage, effectiveness = question.get('usage_count', 0), question.get('effectiveness_score', 0)
+        old_usage, old_effectiveness = self._counted[question['id']]
+        self.total_usage += usage - old_usage
+        self.effectiveness_total += effectiveness - old_effectiveness
+        self._counted[question['id']] = (usage, effectiveness)
+
+    @staticmethod
+    def _count(counts: Dict[str, int], key: str, delta: int):
+        counts[key] = counts.get(key, 0) + delta
+        if not counts[key]:
+            del counts[key]
+
+    def find_by_text(self, text: str) -> Optional[Dict]:
+        """The stored question with the same normalised text, if any"""
+        question_id = self.by_text.get(normalise_question_text(text))
+        return self.by_id.get(question_id) if question_id is not None else None
+
+    def candidate_ids(self,
+                      category: str = None,
+                      difficulty: str = None,
+                      role: str = None) -> Optional[Set[Any]]:
+        """Ids matching the facets, or None when no facet was given (every question matches)"""
+        candidates = None
+        if category or difficulty:
+            candidates = set()
+            for (cat, diff), ids in self.by_facet.items():
+                if (not category or cat == category) and (not difficulty or diff == difficulty):
+                    candidates |= ids
+        if role:
+            role_ids = self.by_role.get(role, set())
+            candidates = set(role_ids) if candidates is None else candidates & role_ids
+        return candidates
+
+    def ranked(self, ids: Optional[Iterable[Any]] = None) -> Iterator[Dict]:
+        """Yield questions by effectiveness, restricted to ids when given"""
+        if ids is None:
+            for _, _, question_id in self._ranking:
+                yield self.by_id[question_id]
+            return
+        for question_id in sorted(ids, key=self._rank_keys.__getitem__):
+            yield self.by_id[question_id]
+
+    def sample(self,
+               category: str = None,
+               difficulty: str = None,
+               role: str = None,
+               count: int = 1,
+               exclude: Iterable[Any] = (),
+               rng: random.Random = None) -> List[Dict]:
+        """
+        Up to `count` distinct questions matching the facets, drawn with probability
+        proportional to effectiveness (floored, so every question keeps some exposure)
+        """
+        facets = (category, difficulty, role)
+        sampler = self._samplers.get(facets)
+        if sampler is None:
+            ids = self.candidate_ids(category=category, difficulty=difficulty, role=role)
+            ids = self.by_id if ids is None else ids
+            sampler = WeightedSampler({
+                question_id: self.by_id[question_id].get('effectiveness_score', 0) for question_id in ids
+            })
+            self._samplers[facets] = sampler
+        return [self.by_id[question_id] for question_id in sampler.sample(count, exclude, rng)]
+
+    @staticmethod
+    def _discard(index: Dict, key, question_id):
+        ids = index.get(key)
+        if ids is None:
+            return
+        ids.discard(question_id)
+        if not ids:
+            del index[key]
@@ -0,0 +1,51 @@
+import json
+import os
+from typing import Dict, List
+
+
+class QuestionJournal:
+    """
+    Append-only write-ahead log for QuestionStorageAgent.
+    Each mutation is one compact JSON line; compaction folds the log into the
+    JSON snapshot and truncates it.
+    """
+
+    def __init__(self, log_file: str, compact_every: int = 500):
+        self.log_file = log_file
+        self.compact_every = compact_every
+        self.entries_since_compaction = 0
+
+    def append(self, entry: Dict):
+        """Append a single mutation to the log"""
+        line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False)
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+        self.entries_since_compaction += 1
+
+    def read(self) -> List[Dict]:
+        """Return all complete entries in the log, ignoring a torn trailing line"""
+        if not os.path.exists(self.log_file):
+            return []
+        entries = []
+        with open(self.log_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # Partial write from a crash; everything after it is untrusted
+                    break
+        self.entries_since_compaction = len(entries)
+        return entries
+
+    def needs_compaction(self) -> bool:
+        return self.entries_since_compaction >= self.compact_every
+
+    def truncate(self):
+        """Empty the log once its entries are part of the snapshot"""
+        with open(self.log_file, "w", encoding="utf-8"):
+            pass
+        self.entries_since_compaction = 0
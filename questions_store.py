@@ -1,29 +1,348 @@
+import functools
 import json
+import logging
+import math
 import os
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Dict, List, Any, Optional, Callable
 from datetime import datetime
 import random
 
+from question_index import QuestionIndex, CONTENT_ID_BASE, content_question_id, normalise_question_text
+from weighted_sampler import SAMPLING_FLOOR
+from question_journal import QuestionJournal
+from file_lock import FileLock, atomic_write_json
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Retention policy for per-question performance data
+DEFAULT_HISTORY_LIMIT = 50   # raw events kept in performance_history (ring buffer)
+DEFAULT_ROLLUP_DAYS = 90     # per-day rollups kept in daily_rollups
+HISTOGRAM_BINS = 10          # score buckets of width 10; 100 falls in the last one
+
+STORE_HELP = "Question store latency by operation"
+
+def calculate_effectiveness(question: Dict) -> float:
+    """Calculate how effective a question is at predicting performance"""
+    if question['usage_count'] < 3:
+        return 0.5  # Default for new questions
+    
+    # Factors for effectiveness calculation
+    score_variance = min(math.sqrt(score_variance_of(question)) / 30, 1.0)  # How well it discriminates
+    usage_factor = min(question['usage_count'] / 50, 1.0)  # More usage = more reliable
+    success_correlation = question.get('success_rate', 0.5)  # Hiring correlation
+    
+    # Weighted effectiveness score
+    effectiveness = (
+        score_variance * 0.4 +  # Discrimination ability
+        usage_factor * 0.3 +    # Reliability through usage
+        success_correlation * 0.3  # Predictive power
+    )
+    
+    return min(max(effectiveness, 0.0), 1.0)  # Clamp between 0 and 1
+
+
+def score_variance_of(question: Dict) -> float:
+    """Sample variance of the question's scores from its running Welford aggregate"""
+    count = question.get('usage_count', 0)
+    if count < 2:
+        return 0.0
+    return question.get('score_m2', 0.0) / (count - 1)
+
+
+def _histogram_bin(score: float) -> int:
+    return min(max(int(score // 10), 0), HISTOGRAM_BINS - 1)
+
+
+def _roll_up(rollups: Dict, day: str, score: float):
+    rollup = rollups.get(day)
+    if rollup is None:
+        rollups[day] = {'count': 1, 'total': score, 'min': score, 'max': score}
+        return
+    rollup['count'] += 1
+    rollup['total'] += score
+    rollup['min'] = min(rollup['min'], score)
+    rollup['max'] = max(rollup['max'], score)
+
+
+def ensure_score_stats(question: Dict):
+    """
+    Backfill streaming aggregates for questions stored before they existed.
+    Each aggregate is checked on its own, so a question that arrives with some of
+    them (e.g. score_m2 in performance_data) still gets the others.
+    """
+    history = question.get('performance_history', [])
+    if 'score_m2' not in question:
+        scores = [h['score'] for h in history]
+        if scores and len(scores) == question.get('usage_count', 0):
+            mean = sum(scores) / len(scores)
+            question['score_m2'] = sum((s - mean) ** 2 for s in scores)
+        else:
+            # No complete history to recover the spread from
+            question['score_m2'] = 0.0
+    if len(question.get('score_histogram') or ()) != HISTOGRAM_BINS:
+        histogram = [0] * HISTOGRAM_BINS
+        for h in history:
+            histogram[_histogram_bin(h['score'])] += 1
+        question['score_histogram'] = histogram
+    if 'daily_rollups' not in question:
+        rollups = question['daily_rollups'] = {}
+        for h in history:
+            _roll_up(rollups, h['timestamp'][:10], h['score'])
+
+
+def record_score(question: Dict, score: float, outcome: str = None):
+    """Update usage_count, avg_score (Welford), score_m2, score_histogram and success_rate in place"""
+    ensure_score_stats(question)
+
+    # Update usage statistics
+    question['usage_count'] = question.get('usage_count', 0) + 1
+    old_avg = question.get('avg_score', 0)
+    count = question['usage_count']
+    question['avg_score'] = old_avg + (score - old_avg) / count
+    question['score_m2'] += (score - old_avg) * (score - question['avg_score'])
+    question['score_histogram'][_histogram_bin(score)] += 1
+
+    # Update success rate if outcome provided
+    if outcome == "hired":
+        old_success = question.get('success_rate', 0)
+        question['success_rate'] = ((old_success * (count - 1)) + 1) / count
+    elif outcome == "not_hired":
+        old_success = question.get('success_rate', 0)
+        question['success_rate'] = (old_success * (count - 1)) / count
+
+
+def record_history(question: Dict, score: float, outcome: str, timestamp: str,
+                   history_limit: int = DEFAULT_HISTORY_LIMIT,
+                   rollup_days: int = DEFAULT_ROLLUP_DAYS):
+    """Append a raw event to the bounded history and fold it into the per-day rollups"""
+    history = question.get('performance_history', [])
+    history.append({
+        'score': score,
+        'timestamp': timestamp,
+        'outcome': outcome
+    })
+    question['performance_history'] = history[-history_limit:]
+
+    rollups = question.setdefault('daily_rollups', {})
+    _roll_up(rollups, timestamp[:10], score)
+    if len(rollups) > rollup_days:
+        # ISO dates sort chronologically
+        for day in sorted(rollups)[:-rollup_days]:
+            del rollups[day]
+
+
+def notify_listeners(listeners: List[Callable], event: str, question: Optional[Dict],
+                     previous_effectiveness: float = None):
+    """
+    Tell change listeners about a mutation.
+    event: "store", "update", "delete" or "reload" (question is None for reload)
+    A failing listener is logged with its traceback and skipped; it never fails the write itself.
+    """
+    for listener in list(listeners):
+        try:
+            listener(event, question, previous_effectiveness)
+        except Exception:
+            logger.exception("Store listener failed on %s event", event)
+
+def _shared_access(method):
+    """Serialise access to a shared store and reload it first if another process changed the file"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            self._refresh_if_stale()
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class QuestionStorageAgent:
-    def __init__(self, storage_file="dynamic_questions.json"):
+    def __init__(self, storage_file="dynamic_questions.json", journal: bool = False, compact_every: int = 500,
+                 history_limit: int = DEFAULT_HISTORY_LIMIT, rollup_days: int = DEFAULT_ROLLUP_DAYS):
         self.storage_file = storage_file
+        self.history_limit = history_limit
+        self.rollup_days = rollup_days
         self.questions = {}
+        self.index = QuestionIndex()
+        # Journaled mode appends each mutation to <storage_file>.log instead of rewriting the snapshot
+        self.journal = QuestionJournal(storage_file + ".log", compact_every) if journal else None
+        self._journal_seq = 0
+        self._lock = threading.RLock()
+        # Held across processes while writing; see _commit
+        self._file_lock = FileLock(storage_file + ".lock")
+        self._file_state = None
+        self._listeners: List[Callable] = []
         self.load_questions()   # this calls the fixed method
         
     def _get_questions_list(self):
         """Return the actual list of questions regardless of storage structure"""
-        return self.questions.get("questions", []) if isinstance(self.questions, dict) else self.questions     
+        if isinstance(self.questions, dict):
+            return self.questions.setdefault("questions", [])
+        return self.questions
+
+    def _rebuild_index(self):
+        """Rebuild the lookup indexes from the current question list"""
+        self.index.rebuild(self._get_questions_list())
 
+    @metrics.timer("store_seconds", STORE_HELP, operation="load")
     def load_questions(self):  
         """Load questions from the storage file if it exists."""
-        if os.path.exists(self.storage_file):
-            try:
-                with open(self.storage_file, "r", encoding="utf-8") as f:
-                    self.questions = json.load(f)
-            except Exception:
+        # The lock of _shared_access, without its staleness check: this is the reload
+        with self._lock:
+            # Taken before reading, so a write that lands mid-read shows up as stale next time
+            file_state = self._current_file_state()
+            if os.path.exists(self.storage_file):
+                try:
+                    with open(self.storage_file, "r", encoding="utf-8") as f:
+                        self.questions = json.load(f)
+                except Exception:
+                    self.questions = {}
+            else:
                 self.questions = {}
-        else:
-            self.questions = {}
+            self._rebuild_index()
+            if self.journal:
+                self._replay_journal()
+            self._file_state = file_state
+            notify_listeners(self._listeners, "reload", None)
+            if self.journal and self.journal.needs_compaction():
+                with self._file_lock:
+                    # Only fold the log if nobody appended to it since it was read
+                    if self._current_file_state() == self._file_state:
+                        self._compact()
+
+    def add_listener(self, listener: Callable):
+        """
+        Register listener(event, question, previous_effectiveness), called after every
+        store/update/delete applied to this instance and after each reload from disk
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _current_file_state(self):
+        """(inode, mtime, size) of every file backing the store, None for missing files"""
+        paths = [self.storage_file] + ([self.journal.log_file] if self.journal else [])
+        state = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                # Atomic saves replace the file, so the inode changes even within one mtime tick
+                state.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                state.append(None)
+        return tuple(state)
+
+    def _remember_file_state(self):
+        self._file_state = self._current_file_state()
+
+    def _refresh_if_stale(self):
+        """Reload when the backing files changed since this instance last read or wrote them"""
+        if self._current_file_state() != self._file_state:
+            self.load_questions()
+
+    def _snapshot_metadata(self) -> Dict:
+        """Metadata block stored alongside the questions in the snapshot file"""
+        if isinstance(self.questions, dict):
+            return self.questions.setdefault("metadata", {})
+        return {}
+
+    def _replay_journal(self):
+        """Apply log entries written after the snapshot was taken"""
+        self._journal_seq = self._snapshot_metadata().get("journal_seq", 0)
+        for entry in self.journal.read():
+            if entry.get("seq", 0) <= self._journal_seq:
+                continue  # already folded into the snapshot
+            self._apply_entry(entry)
+            self._journal_seq = entry["seq"]
+            if "at" in entry:
+                self._snapshot_metadata()["last_updated"] = entry["at"]
+
+    def _apply_entry(self, entry: Dict):
+        """Apply a single journaled mutation to the in-memory bank"""
+        op = entry.get("op")
+        if op == "store":
+            question_entry = entry["question"]
+            self._get_questions_list().append(question_entry)
+            self.index.add(question_entry)
+            notify_listeners(self._listeners, "store", question_entry)
+        elif op == "store_many":
+            for question_entry in entry["questions"]:
+                self._apply_entry({"op": "store", "question": question_entry})
+        elif op == "update":
+            question = self.index.get(entry["id"])
+            if question:
+                self._apply_performance_update(question, entry["score"], entry.get("outcome"), entry["timestamp"])
+        elif op == "delete":
+            self._remove_question(entry["id"])
+        elif op == "batch":
+            for update in entry["updates"]:
+                self._apply_entry({"op": "update", **update})
+
+    def _commit(self, entry: Dict):
+        """
+        Persist a mutation: one log line in journaled mode, a full snapshot otherwise.
+        Writes are optimistic: the mutation has already been applied to the in-memory
+        bank. Under the cross-process file lock, if another process wrote in the
+        meantime, the bank is reloaded from disk and the mutation re-applied on top
+        (scores are deltas, so nobody's update is lost) before writing.
+        """
+        with self._file_lock:
+            if self._current_file_state() != self._file_state:
+                self.load_questions()
+                if not self._merge_entry(entry):
+                    return
+            timestamp = datetime.now().isoformat()
+            self._snapshot_metadata()["last_updated"] = timestamp
+            if not self.journal:
+                self.save_questions()
+                return
+            self._journal_seq += 1
+            self.journal.append({"seq": self._journal_seq, "at": timestamp, **entry})
+            self._remember_file_state()
+            if self.journal.needs_compaction():
+                self._compact()
+
+    def _merge_entry(self, entry: Dict) -> bool:
+        """
+        Re-apply a mutation made against a stale copy of the bank to the fresh one.
+        Returns False when nothing is left to write (the questions were already stored).
+        """
+        op = entry.get("op")
+        if op in ("store", "store_many"):
+            for question_entry in entry.get("questions") or [entry["question"]]:
+                # Text first: another process may have stored the same question under another id
+                existing = self.index.find_by_text(question_entry.get('question'))
+                if existing:
+                    # Another process stored the same question first; share its record
+                    question_entry['id'] = existing['id']
+                    question_entry['_merged'] = True
+                    continue
+                if self.index.get(question_entry['id']):
+                    # Sequential id taken by a different question meanwhile: take the next free one
+                    question_entry['id'] = self._generate_question_id()
+                self._apply_entry({"op": "store", "question": question_entry})
+            if op == "store_many":
+                entry["questions"] = [q for q in entry["questions"] if not q.pop('_merged', False)]
+                return bool(entry["questions"])
+            return not entry["question"].pop('_merged', False)
+        self._apply_entry(entry)
+        return True
+
+    @_shared_access
+    def compact(self):
+        """Fold the journal into the snapshot file and truncate it"""
+        with self._file_lock:
+            self._refresh_if_stale()
+            self._compact()
+
+    def _compact(self):
+        self._snapshot_metadata()["journal_seq"] = self._journal_seq
+        self.save_questions()
+        if self.journal:
+            self.journal.truncate()
+        self._remember_file_state()
     
     def _initialize_seed_questions(self):
         """Create initial question bank with seed questions"""
@@ -35,6 +354,7 @@ class QuestionStorageAgent:
                 "category": "basic_formulas",
                 "difficulty": "basic",
                 "keywords": ["SUM", "formula", "range"],
+                "reference_answer": "Use =SUM(A1:A10), which adds every number in the range and ignores blank or text cells; AutoSum (Alt+=) inserts the same formula.",
                 "target_roles": ["finance", "operations", "data_analytics"],
                 "usage_count": 0,
                 "avg_score": 0.0,
@@ -51,6 +371,7 @@ class QuestionStorageAgent:
                 "category": "data_manipulation",
                 "difficulty": "intermediate",
                 "keywords": ["remove duplicates", "data", "filter", "unique"],
+                "reference_answer": "Select the data and use Data > Remove Duplicates, ticking the columns that define a duplicate row; or use Advanced Filter with unique records only, or the UNIQUE function to list distinct values without changing the source.",
                 "target_roles": ["data_analytics", "operations"],
                 "usage_count": 0,
                 "avg_score": 0.0,
@@ -67,6 +388,7 @@ class QuestionStorageAgent:
                 "category": "lookup_functions",
                 "difficulty": "advanced",
                 "keywords": ["VLOOKUP", "INDEX", "MATCH", "lookup"],
+                "reference_answer": "VLOOKUP searches the first column of a table and returns a value from a column to its right by column number, so it cannot look left and breaks when columns are inserted. INDEX-MATCH uses MATCH to find the row position and INDEX to return the value from any column, so it can look left, is robust to inserted columns and is often faster on large tables. Both need exact match (FALSE or 0) for IDs.",
                 "target_roles": ["finance", "data_analytics"],
                 "usage_count": 0,
                 "avg_score": 0.0,
@@ -83,6 +405,7 @@ class QuestionStorageAgent:
                 "category": "data_analysis",
                 "difficulty": "intermediate",
                 "keywords": ["pivot table", "sales data", "analysis", "region"],
+                "reference_answer": "Select the sales data (ideally formatted as a table) and choose Insert > PivotTable. Drag Region to Rows, Product to Columns, and the sales amount to Values summarized by Sum; add slicers or report filters, and refresh the pivot when the source data changes.",
                 "target_roles": ["finance", "operations", "data_analytics"],
                 "usage_count": 0,
                 "avg_score": 0.0,
@@ -99,6 +422,7 @@ class QuestionStorageAgent:
                 "category": "basic_formulas",
                 "difficulty": "basic",
                 "keywords": ["absolute", "relative", "cell reference", "$"],
+                "reference_answer": "A relative reference such as A1 shifts when the formula is copied, while an absolute reference such as $A$1 stays fixed because the dollar signs lock the column and row; mixed references like $A1 or A$1 lock only one. For example, =B2*$E$1 copied down keeps pointing at the tax rate in E1. F4 toggles between them.",
                 "target_roles": ["finance", "operations", "data_analytics"],
                 "usage_count": 0,
                 "avg_score": 0.0,
@@ -115,6 +439,7 @@ class QuestionStorageAgent:
                 "category": "advanced_formulas",
                 "difficulty": "intermediate",
                 "keywords": ["SUMIF", "conditional", "criteria", "sales"],
+                "reference_answer": "Use =SUMIF(A2:A100, \"Widget\", C2:C100): the first range holds the product names, the criteria is the product (better as a cell reference like F1), and the sum range holds the sales amounts. SUMIFS handles several conditions, such as product and region.",
                 "target_roles": ["finance", "operations"],
                 "usage_count": 0,
                 "avg_score": 0.0,
@@ -126,9 +451,58 @@ class QuestionStorageAgent:
             }
         ]
         self.questions = seed_questions
+        self._rebuild_index()
     
+    @_shared_access
     def store_question(self, question: Dict, performance_data: Dict = None):
-        """Store new question with performance metadata"""
+        """
+        Store new question with performance metadata.
+        Returns the id the question is stored under: re-storing a known question
+        (same id, or same normalised text) keeps the existing record and returns its id.
+        """
+        question_entry = self._new_entry(question, performance_data)
+        if question_entry is None:
+            return self._existing(question)['id']
+        self._get_questions_list().append(question_entry)
+        self.index.add(question_entry)
+        self._commit({"op": "store", "question": question_entry})
+        notify_listeners(self._listeners, "store", question_entry)
+        return question_entry['id']
+
+    @_shared_access
+    def store_questions(self, questions: List[Dict]) -> List[Any]:
+        """
+        Store many questions with a single write (e.g. the expanded template catalogue).
+        Returns the stored id of each question, in order; known questions keep their record.
+        """
+        stored = []
+        added = []
+        for question in questions:
+            question_entry = self._new_entry(question)
+            if question_entry is None:
+                stored.append(self._existing(question))
+                continue
+            self._get_questions_list().append(question_entry)
+            self.index.add(question_entry)
+            added.append(question_entry)
+            stored.append(question_entry)
+        if added:
+            self._commit({"op": "store_many", "questions": added})
+            for question_entry in added:
+                notify_listeners(self._listeners, "store", question_entry)
+        # Read ids after the commit: merging with another process's writes may renumber them
+        return [question_entry['id'] for question_entry in stored]
+
+    def _existing(self, question: Dict) -> Optional[Dict]:
+        """The stored record a question duplicates: same id, or same normalised text"""
+        existing = self.index.get(question['id']) if 'id' in question else None
+        return existing or self.index.find_by_text(question.get('question'))
+
+    def _new_entry(self, question: Dict, performance_data: Dict = None) -> Optional[Dict]:
+        """Stored form of a new question, or None if it is already in the bank"""
+        if self._existing(question):
+            return None
+
         # Generate unique ID if not provided
         if 'id' not in question:
             question['id'] = self._generate_question_id()
@@ -145,68 +519,63 @@ class QuestionStorageAgent:
         
         if performance_data:
             question_entry.update(performance_data)
-        
-        self._get_questions_list().append(question_entry)
-        self.save_questions()
-        return question_entry['id']
+        return question_entry
     
+    @metrics.timer("store_seconds", STORE_HELP, operation="update")
+    @_shared_access
     def update_question_performance(self, question_id: int, score: int, outcome: str = None):
         """Update question performance based on candidate results"""
-        # Make sure we are iterating the actual list of questions
-        
-        questions_list = self._get_questions_list()
-        for question in questions_list:
-            if question['id'] == question_id:
-                # Update usage statistics
-                question['usage_count'] = question.get('usage_count', 0) + 1
-                old_avg = question.get('avg_score', 0)
-                count = question['usage_count']
-                question['avg_score'] = ((old_avg * (count - 1)) + score) / count
-
-                # Update success rate if outcome provided
-                if outcome == "hired":
-                    old_success = question.get('success_rate', 0)
-                    question['success_rate'] = ((old_success * (count - 1)) + 1) / count
-                elif outcome == "not_hired":
-                    old_success = question.get('success_rate', 0)
-                    question['success_rate'] = (old_success * (count - 1)) / count
-
-                # Track performance history
-                history = question.get('performance_history', [])
-                history.append({
-                    'score': score,
-                    'timestamp': datetime.now().isoformat(),
-                    'outcome': outcome
-                })
-                question['performance_history'] = history
-
-                # Calculate effectiveness score
-                question['effectiveness_score'] = self._calculate_effectiveness(question)
-                break
+        question = self.index.get(question_id)
+        if not question:
+            # Nothing to record for an unknown question
+            return
+        timestamp = datetime.now().isoformat()
+        self._apply_performance_update(question, score, outcome, timestamp)
+        self._commit({"op": "update", "id": question_id, "score": score, "outcome": outcome, "timestamp": timestamp})
+
+    @metrics.timer("store_seconds", STORE_HELP, operation="update")
+    @_shared_access
+    def update_questions_performance(self, updates: List[Dict]):
+        """
+        Record several results with a single write.
+        updates: List of dicts with 'question_id', 'score' and optional 'outcome' keys
+        """
+        timestamp = datetime.now().isoformat()
+        applied = []
+        for update in updates:
+            question = self.index.get(update['question_id'])
+            if not question:
+                continue
+            self._apply_performance_update(question, update['score'], update.get('outcome'), timestamp)
+            applied.append({"id": update['question_id'], "score": update['score'],
+                            "outcome": update.get('outcome'), "timestamp": timestamp})
+        if applied:
+            self._commit({"op": "batch", "updates": applied})
+
+    def _apply_performance_update(self, question: Dict, score: int, outcome: str, timestamp: str):
+        """Fold one scored answer into a question's statistics"""
+        previous_effectiveness = question.get('effectiveness_score', 0)
+        # Per-question version: one bump per recorded answer, so concurrent writers can be audited
+        question['version'] = question.get('version', 0) + 1
+        record_score(question, score, outcome)
+
+        # Track performance history
+        record_history(question, score, outcome, timestamp, self.history_limit, self.rollup_days)
+
+        # Calculate effectiveness score
+        question['effectiveness_score'] = self._calculate_effectiveness(question)
+        self.index.reindex_effectiveness(question)
+        notify_listeners(self._listeners, "update", question, previous_effectiveness)
 
-        self.save_questions()
 
     
     def _calculate_effectiveness(self, question: Dict) -> float:
         """Calculate how effective a question is at predicting performance"""
-        if question['usage_count'] < 3:
-            return 0.5  # Default for new questions
-        
-        # Factors for effectiveness calculation
-        score_variance = abs(question['avg_score'] - 70) / 30  # How well it discriminates
-        usage_factor = min(question['usage_count'] / 50, 1.0)  # More usage = more reliable
-        success_correlation = question.get('success_rate', 0.5)  # Hiring correlation
-        
-        # Weighted effectiveness score
-        effectiveness = (
-            score_variance * 0.4 +  # Discrimination ability
-            usage_factor * 0.3 +    # Reliability through usage
-            success_correlation * 0.3  # Predictive power
-        )
-        
-        return min(max(effectiveness, 0.0), 1.0)  # Clamp between 0 and 1
+        return calculate_effectiveness(question)
     
 
+    @metrics.timer("store_seconds", STORE_HELP, operation="query")
+    @_shared_access
     def get_questions_by_criteria(self, 
                                 category: str = None, 
                                 difficulty: str = None, 
@@ -214,121 +583,154 @@ class QuestionStorageAgent:
                                 min_effectiveness: float = 0.0,
                                 count: int = None) -> List[Dict]:
         """Retrieve questions based on specific criteria with fallback if not enough"""
-        filtered_questions = self._get_questions_list().copy()
-        
-        if category:
-            filtered_questions = [q for q in filtered_questions if q.get('category') == category]
-        if difficulty:
-            filtered_questions = [q for q in filtered_questions if q.get('difficulty') == difficulty]
-        if role:
-            filtered_questions = [q for q in filtered_questions if role in q.get('target_roles', [])]
-        if min_effectiveness > 0:
-            filtered_questions = [q for q in filtered_questions if q.get('effectiveness_score', 0) >= min_effectiveness]
-
-        # Sort by effectiveness descending
-        filtered_questions.sort(key=lambda x: x.get('effectiveness_score', 0), reverse=True)
-        
+        candidates = self.index.candidate_ids(category=category, difficulty=difficulty, role=role)
+
+        # Walk candidates by effectiveness descending, stopping once count is reached
+        filtered_questions = []
+        for question in self.index.ranked(candidates):
+            if min_effectiveness > 0 and question.get('effectiveness_score', 0) < min_effectiveness:
+                # Ranked order means nothing further can qualify
+                break
+            filtered_questions.append(question)
+            if count and len(filtered_questions) >= count:
+                break
+
         # Fallback: return as many as possible even if less than count
-        if count:
-            return filtered_questions[:count]
         return filtered_questions
 
     
-    def get_best_questions(self, role: str, count: int = 6) -> List[Dict]:
-        """Get the most effective questions for a specific role"""
-        role_questions = [q for q in self._get_questions_list() if role in q.get('target_roles', [])]
+    @metrics.timer("store_seconds", STORE_HELP, operation="sample")
+    @_shared_access
+    def sample_questions(self,
+                         category: str = None,
+                         difficulty: str = None,
+                         role: str = None,
+                         count: int = 1,
+                         exclude=()) -> List[Dict]:
+        """
+        Draw up to `count` distinct matching questions, weighted by effectiveness.
+        Unlike get_questions_by_criteria, repeated calls spread exposure across the bank.
+        exclude: ids that must not be returned (e.g. already in the interview)
+        """
+        return self.index.sample(category=category, difficulty=difficulty, role=role,
+                                 count=count, exclude=exclude)
+
+    @metrics.timer("store_seconds", STORE_HELP, operation="best")
+    @_shared_access
+    def get_best_questions(self, role: str, count: int = 6, sample: bool = False) -> List[Dict]:
+        """
+        Get the most effective questions for a specific role.
+        sample: draw by effectiveness instead of always taking the top ones
+        """
         # Ensure we have questions across different difficulties
         difficulties = ['basic', 'intermediate', 'advanced']
         selected_questions = []
+        selected_ids = set()
         
         for difficulty in difficulties:
-            difficulty_questions = [q for q in role_questions if q.get('difficulty') == difficulty]
-            difficulty_questions.sort(key=lambda x: x.get('effectiveness_score', 0), reverse=True)
-            
             # Take top 2 from each difficulty level
-            selected_questions.extend(difficulty_questions[:2])
+            if sample:
+                picked = self.index.sample(difficulty=difficulty, role=role, count=2)
+            else:
+                picked = self.get_questions_by_criteria(difficulty=difficulty, role=role, count=2)
+            for question in picked:
+                selected_questions.append(question)
+                selected_ids.add(question['id'])
         
+        if sample and len(selected_questions) < count:
+            selected_questions.extend(self.index.sample(role=role, count=count - len(selected_questions),
+                                                        exclude=selected_ids))
         # If we need more questions, fill with remaining best questions
         if len(selected_questions) < count:
-            remaining_questions = [q for q in role_questions if q not in selected_questions]
-            remaining_questions.sort(key=lambda x: x.get('effectiveness_score', 0), reverse=True)
-            selected_questions.extend(remaining_questions[:count - len(selected_questions)])
+            for question in self.index.ranked(self.index.candidate_ids(role=role)):
+                if len(selected_questions) >= count:
+                    break
+                if question['id'] not in selected_ids:
+                    selected_questions.append(question)
+                    selected_ids.add(question['id'])
         
         return selected_questions[:count]
     
+    @_shared_access
     def get_question_by_id(self, question_id: int) -> Optional[Dict]:
         """Retrieve a specific question by ID"""
-        for question in self._get_questions_list():
-            if question['id'] == question_id:
-                return question
-        return None
+        return self.index.get(question_id)
     
+    @_shared_access
     def delete_question(self, question_id: int) -> bool:
         """Delete a question from storage"""
+        if not self._remove_question(question_id):
+            return False
+        self._commit({"op": "delete", "id": question_id})
+        return True
+
+    def _remove_question(self, question_id) -> bool:
+        """Drop a question from the list and indexes without persisting"""
+        question = self.index.remove(question_id)
+        if question is None:
+            return False
         questions_list = self._get_questions_list()
-        for i, question in enumerate(questions_list):
-            if question['id'] == question_id:
+        for i, stored in enumerate(questions_list):
+            if stored is question:
                 del questions_list[i]
-                self.save_questions()
-                return True
-        return False
+                break
+        # Another question may share the id (legacy hash ids); index it in place of the deleted one
+        for stored in questions_list:
+            if stored['id'] == question_id:
+                self.index.add(stored)
+                break
+        # Likewise for a legacy duplicate of the text stored under a different id
+        text = normalise_question_text(question.get('question'))
+        if text not in self.index.by_text:
+            for stored in questions_list:
+                if normalise_question_text(stored.get('question')) == text and self.index.get(stored['id']) is stored:
+                    self.index.by_text[text] = stored['id']
+                    break
+        notify_listeners(self._listeners, "delete", question)
+        return True
     
+    @_shared_access
     def get_analytics(self) -> Dict[str, Any]:
-        """Get analytics about the question bank"""
-        questions_list = self._get_questions_list()
-        if not questions_list:
+        """
+        Get analytics about the question bank.
+        Read from running totals kept by the index, so the cost does not grow with the bank.
+        """
+        index = self.index
+        if not len(index):
             return {"error": "No questions in database"}
-        
-        total_questions = len(questions_list)
-        total_usage = sum(q.get('usage_count', 0) for q in questions_list)
-        avg_effectiveness = sum(q.get('effectiveness_score', 0) for q in questions_list) / total_questions
-
-        # Category distribution
-        categories = {}
-        for question in questions_list:
-            cat = question.get('category', 'unknown')
-            categories[cat] = categories.get(cat, 0) + 1
-
-        # Difficulty distribution
-        difficulties = {}
-        for question in questions_list:
-            diff = question.get('difficulty', 'unknown')
-            difficulties[diff] = difficulties.get(diff, 0) + 1
-
-        # Top performing questions
-        top_questions = sorted(questions_list, key=lambda x: x.get('effectiveness_score', 0), reverse=True)[:5]
 
         return {
-            'total_questions': total_questions,
-            'total_usage': total_usage,
-            'average_effectiveness': round(avg_effectiveness, 3),
-            'category_distribution': categories,
-            'difficulty_distribution': difficulties,
+            'total_questions': len(index),
+            'total_usage': index.total_usage,
+            'average_effectiveness': round(index.effectiveness_total / len(index), 3),
+            'category_distribution': dict(index.category_counts),
+            'difficulty_distribution': dict(index.difficulty_counts),
             'top_questions': [
                 {
                     'id': q['id'],
                     'question': q['question'][:50] + '...',
                     'effectiveness': q.get('effectiveness_score', 0)
                 }
-                for q in top_questions
+                for q in index.top(5)
             ],
-            'last_updated': getattr(self, "metadata", {}).get("last_updated")
+            'last_updated': self._snapshot_metadata().get("last_updated")
         }
 
-            
-            
+    @metrics.timer("store_seconds", STORE_HELP, operation="save")
+    @_shared_access
     def save_questions(self):
-        """Save all questions to storage file."""
-        with open(self.storage_file, "w", encoding="utf-8") as f:
-            json.dump(self.questions, f, indent=4, ensure_ascii=False)           
+        """Save all questions to storage file (atomically, via a temp file and rename)."""
+        with self._file_lock:
+            atomic_write_json(self.storage_file, self.questions, indent=4, ensure_ascii=False)
+            self._remember_file_state()
         
     
     def _generate_question_id(self) -> int:
-        """Generate unique question ID"""
-        existing_ids = [q['id'] for q in self._get_questions_list()]
-        new_id = max(existing_ids, default=0) + 1
+        """Generate unique sequential ID; content-addressed ids are left out of the sequence"""
+        new_id = max((qid for qid in self.index.by_id if qid < CONTENT_ID_BASE), default=0) + 1
         return new_id
     
+    @_shared_access
     def backup_questions(self, backup_file: str = None):
         """Create backup of questions database"""
         if not backup_file:
@@ -338,20 +740,53 @@ class QuestionStorageAgent:
         try:
             with open(backup_file, 'w') as f:
                 json.dump({
-                    'questions': self.questions,
-                    'metadata': self.metadata
+                    'questions': self._get_questions_list(),
+                    'metadata': self._snapshot_metadata()
                 }, f, indent=2)
             return backup_file
-        except IOError as e:
-            print(f"Error creating backup: {e}")
+        except IOError:
+            logger.exception("Error creating backup %s", backup_file)
             return None
 
 # Utility functions for external use
-def load_storage_agent(storage_file: str = "dynamic_questions.json") -> QuestionStorageAgent:
-    """Factory function to create and return storage agent"""
+_STORE_REGISTRY: Dict[tuple, Any] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+def load_storage_agent(storage_file: str = "dynamic_questions.json", backend: str = None,
+                       shared: bool = True) -> QuestionStorageAgent:
+    """
+    Factory function to create and return storage agent.
+    backend: "json" (rewrite the file on every change), "journal" (append-only log)
+    or "sqlite" (indexed database, QUESTION_STORE_DB or <storage_file>.db);
+    defaults to the QUESTION_STORE_BACKEND environment variable, then "json".
+    With shared=True every caller in the process gets the same instance per file.
+    """
+    backend = backend or os.getenv("QUESTION_STORE_BACKEND", "json")
+    if not shared:
+        return _create_storage_agent(storage_file, backend)
+    key = (backend, os.path.abspath(storage_file))
+    with _REGISTRY_LOCK:
+        agent = _STORE_REGISTRY.get(key)
+        if agent is None:
+            agent = _create_storage_agent(storage_file, backend)
+            _STORE_REGISTRY[key] = agent
+    return agent
+
+def _create_storage_agent(storage_file: str, backend: str):
+    if backend == "sqlite":
+        from sqlite_store import SQLiteQuestionStorageAgent
+        db_file = os.getenv("QUESTION_STORE_DB") or os.path.splitext(storage_file)[0] + ".db"
+        return SQLiteQuestionStorageAgent(db_file, import_file=storage_file)
+    if backend == "journal":
+        return QuestionStorageAgent(storage_file, journal=True)
     return QuestionStorageAgent(storage_file)
 
+def clear_storage_registry():
+    """Forget shared store instances (the next load_storage_agent call re-reads from disk)"""
+    with _REGISTRY_LOCK:
+        _STORE_REGISTRY.clear()
+
 def get_question_stats(storage_file: str = "dynamic_questions.json") -> Dict:
     """Quick function to get question bank statistics"""
-    agent = QuestionStorageAgent(storage_file)
-    return agent.get_analytics()
\ No newline at end of file
+    agent = load_storage_agent(storage_file)
+    return agent.get_analytics()
@@ -0,0 +1,125 @@
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple, Iterable
+
+import numpy as np
+
+from evaluator_backends import EvaluatorBackend
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "between", "by", "can", "do", "does", "for", "from",
+    "how", "i", "if", "in", "into", "is", "it", "its", "of", "on", "or", "so", "that", "the", "then",
+    "this", "to", "use", "using", "what", "when", "which", "with", "would", "you", "your", "excel"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall((text or "").lower())
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+class TfidfBackend(EvaluatorBackend):
+    """
+    Local, deterministic scorer: cosine similarity between TF-IDF vectors of the
+    answer and the question's reference answer, computed with NumPy.
+    The reference is question['reference_answer'] (the seed and template questions
+    ship one), else reference_answers[id], else the question's keywords; a question
+    with none of these gets no score ({}) and stays rule-based. Strengths and
+    improvements never name terms of the question text itself. Document
+    frequencies come from the references of `corpus` (e.g. the stored bank);
+    unseen terms get the highest IDF.
+    """
+    name = "tfidf"
+    remote = False
+    source = "Similarity+Rule-based"
+
+    def __init__(self, corpus: Iterable[Dict] = (), reference_answers: Dict[Any, str] = None,
+                 blend_weight: float = None):
+        super().__init__(blend_weight)
+        self.reference_answers = reference_answers or {}
+        self.document_frequency: Counter = Counter()
+        self.documents = 0
+        self.fit(corpus)
+
+    def fit(self, questions: Iterable[Dict]):
+        """Add the references of `questions` to the document frequencies"""
+        for question in questions:
+            reference = self.reference_text(question)
+            if reference:
+                self.document_frequency.update(set(tokenize(reference)))
+                self.documents += 1
+
+    def reference_text(self, question: Dict[str, Any]) -> str:
+        """The question's reference answer, else its keywords, or "" if it has neither"""
+        return (question.get('reference_answer') or self.reference_answers.get(question.get('id'))
+                or " ".join(question.get('keywords', [])))
+
+    def evaluate(self, question: Dict[str, Any], response: str) -> Dict[str, Any]:
+        return self.evaluate_batch([(question, response)])[0]
+
+    def evaluate_batch(self, items: List[Tuple[Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+        feedbacks = [{} for _ in items]
+        references, answers, scored = [], [], []
+        for i, (question, response) in enumerate(items):
+            reference = tokenize(self.reference_text(question))
+            if not reference:
+                continue
+            references.append(reference)
+            answers.append(tokenize(response))
+            scored.append(i)
+        if not scored:
+            return feedbacks
+
+        vocabulary: Dict[str, int] = {}
+        for tokens in references + answers:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+
+        # Smoothed IDF as in scikit-learn: log((1 + N) / (1 + df)) + 1
+        frequencies = np.fromiter((self.document_frequency.get(term, 0) for term in vocabulary),
+                                  dtype=float, count=len(vocabulary))
+        idf = np.log((1 + self.documents) / (1 + frequencies)) + 1
+        reference_matrix = self._weights(references, vocabulary, idf)
+        answer_matrix = self._weights(answers, vocabulary, idf)
+
+        norms = np.linalg.norm(reference_matrix, axis=1) * np.linalg.norm(answer_matrix, axis=1)
+        dots = np.einsum("ij,ij->i", reference_matrix, answer_matrix)
+        similarities = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+        for row, (reference, answer) in enumerate(zip(references, answers)):
+            # Reference terms by weight: the ones the answer covers are strengths, the rest gaps.
+            # Terms the question already states are neither ("Cover table" for a question about tables)
+            question_terms = set(tokenize(items[scored[row]][0].get('question')))
+            ranked = sorted(set(reference) - question_terms,
+                            key=lambda term: (-reference_matrix[row, vocabulary[term]], term))
+            answer_terms = set(answer)
+            covered = [term for term in ranked if term in answer_terms]
+            missing = [term for term in ranked if term not in answer_terms]
+            feedbacks[scored[row]] = self._feedback(float(similarities[row]), covered, missing)
+        return feedbacks
+
+    @staticmethod
+    def _weights(documents: List[List[str]], vocabulary: Dict[str, int], idf: np.ndarray) -> np.ndarray:
+        """Sublinear TF (1 + log tf) times IDF, one row per document"""
+        matrix = np.zeros((len(documents), len(vocabulary)))
+        for row, tokens in enumerate(documents):
+            for term, count in Counter(tokens).items():
+                matrix[row, vocabulary[term]] = 1 + np.log(count)
+        return matrix * idf
+
+    @staticmethod
+    def _feedback(similarity: float, covered: List[str], missing: List[str]) -> Dict[str, Any]:
+        score = round(min(max(similarity, 0.0), 1.0) * 100, 1)
+        if score >= 70:
+            summary = "Answer closely matches the expected approach."
+        elif score >= 40:
+            summary = "Answer covers part of the expected approach."
+        else:
+            summary = "Answer differs substantially from the expected approach."
+        return {
+            'ai_score': score,
+            'strengths': [f"Mentions {term}" for term in covered[:3]],
+            'improvements': [f"Cover {term}" for term in missing[:3]],
+            'feedback': summary
+        }
@@ -0,0 +1,655 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable
+
+from questions_store import (
+    calculate_effectiveness, ensure_score_stats, record_score, notify_listeners,
+    CONTENT_ID_BASE, SAMPLING_FLOOR, normalise_question_text,
+    DEFAULT_HISTORY_LIMIT, DEFAULT_ROLLUP_DAYS, HISTOGRAM_BINS, STORE_HELP
+)
+from question_index import matches_facets
+from weighted_sampler import WeightedSampler
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Columns stored natively; every other question field lives in the `extra` JSON column
+QUESTION_COLUMNS = [
+    "id", "question", "type", "category", "difficulty",
+    "usage_count", "avg_score", "success_rate", "effectiveness_score",
+    "created_date", "generated", "score_m2"
+]
+COLUMN_DEFAULTS = {"usage_count": 0, "avg_score": 0.0, "success_rate": 0.0, "effectiveness_score": 0.5}
+# Columns added after the first schema version, created on open when missing
+MIGRATED_COLUMNS = {
+    "score_m2": "REAL NOT NULL DEFAULT 0",
+    "score_histogram": "TEXT NOT NULL DEFAULT '[]'",
+    "text_key": "TEXT"
+}
+# Metadata key counting committed writes; the cached samplers are only trusted while it is unchanged
+CHANGE_COUNT_KEY = "change_count"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    question TEXT NOT NULL,
+    type TEXT,
+    category TEXT,
+    difficulty TEXT,
+    usage_count INTEGER NOT NULL DEFAULT 0,
+    avg_score REAL NOT NULL DEFAULT 0,
+    success_rate REAL NOT NULL DEFAULT 0,
+    effectiveness_score REAL NOT NULL DEFAULT 0.5,
+    created_date TEXT,
+    generated INTEGER NOT NULL DEFAULT 0,
+    score_m2 REAL NOT NULL DEFAULT 0,
+    score_histogram TEXT NOT NULL DEFAULT '[]',
+    text_key TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    min_score REAL NOT NULL,
+    max_score REAL NOT NULL,
+    PRIMARY KEY (question_id, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS question_roles (
+    role TEXT NOT NULL,
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    PRIMARY KEY (role, question_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS performance_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    outcome TEXT
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_questions_facet ON questions(category, difficulty, effectiveness_score);
+CREATE INDEX IF NOT EXISTS idx_questions_difficulty ON questions(difficulty, effectiveness_score);
+CREATE INDEX IF NOT EXISTS idx_questions_effectiveness ON questions(effectiveness_score);
+CREATE INDEX IF NOT EXISTS idx_roles_question ON question_roles(question_id);
+CREATE INDEX IF NOT EXISTS idx_history_question ON performance_history(question_id);
+"""
+
+SELECT_QUESTION = """
+SELECT q.*, (SELECT json_group_array(r.role) FROM question_roles r WHERE r.question_id = q.id) AS target_roles
+FROM questions q
+"""
+
+
+class SQLiteQuestionStorageAgent:
+    """
+    QuestionStorageAgent backed by a local SQLite file.
+    Exposes the same public API as the JSON store; queries run against indexed
+    tables instead of an in-memory copy of the bank, and every write runs in
+    its own IMMEDIATE transaction so concurrent sessions and processes serialise
+    cleanly.
+    """
+
+    def __init__(self, db_file: str = "dynamic_questions.db", import_file: str = "dynamic_questions.json",
+                 history_limit: int = DEFAULT_HISTORY_LIMIT, rollup_days: int = DEFAULT_ROLLUP_DAYS):
+        self.db_file = db_file
+        self.history_limit = history_limit
+        self.rollup_days = rollup_days
+        # Existing JSON bank copied into an empty database on first use
+        self.import_file = import_file
+        self._local = threading.local()
+        self._listeners: List[Callable] = []
+        # Effectiveness-weighted samplers per (category, difficulty, role), as in QuestionIndex,
+        # valid for the change count in _sampler_version
+        self._samplers: Dict[tuple, WeightedSampler] = {}
+        self._sampler_version: Optional[int] = None
+        self._sampler_lock = threading.Lock()
+        self.load_questions()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; Streamlit serves each session on its own thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction that takes the database lock up front"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @metrics.timer("store_seconds", STORE_HELP, operation="load")
+    def load_questions(self):
+        """Create the schema and import the JSON bank if the database is empty"""
+        conn = self._connection()
+        had_rollups = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_rollups'").fetchone() is not None
+        conn.executescript(SCHEMA)
+        existing = {row['name'] for row in conn.execute("PRAGMA table_info(questions)")}
+        for column, definition in MIGRATED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE questions ADD COLUMN {column} {definition}")
+        if existing and "score_m2" not in existing:
+            self._backfill_score_stats(rollups=not had_rollups)
+        # Dedup key: normalised question text, backfilled for rows written before it existed
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_text_key ON questions(text_key)")
+        missing = conn.execute("SELECT id, question FROM questions WHERE text_key IS NULL").fetchall()
+        if missing:
+            with self._transaction() as conn:
+                conn.executemany("UPDATE questions SET text_key = ? WHERE id = ?",
+                                 [(normalise_question_text(row['question']), row['id']) for row in missing])
+        empty = conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0] == 0
+        if empty and self.import_file and os.path.exists(self.import_file):
+            self.import_json(self.import_file)
+
+    def add_listener(self, listener: Callable):
+        """
+        Register listener(event, question, previous_effectiveness), called after every
+        committed store/update/delete made through this instance
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _roles_of(self, question_id: int) -> List[str]:
+        return [row['role'] for row in self._connection().execute(
+            "SELECT role FROM question_roles WHERE question_id = ?", (question_id,)
+        )]
+
+    def import_json(self, json_file: str) -> int:
+        """Copy questions and history from a JSON bank file; returns the number imported"""
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return 0
+        questions = data.get("questions", []) if isinstance(data, dict) else data
+        metadata = data.get("metadata", {}) if isinstance(data, dict) else {}
+        imported = 0
+        with self._transaction() as conn:
+            for question in questions:
+                if conn.execute("SELECT 1 FROM questions WHERE id = ?", (question['id'],)).fetchone():
+                    continue
+                self._insert(conn, question)
+                imported += 1
+            for key, value in metadata.items():
+                if key != CHANGE_COUNT_KEY:
+                    conn.execute("INSERT OR REPLACE INTO metadata(key, value) VALUES (?, ?)",
+                                 (key, json.dumps(value)))
+            self._touch(conn)
+        return imported
+
+    def _backfill_score_stats(self, rollups: bool):
+        """
+        Rebuild score_m2 and score_histogram (and the daily rollups, if that table is new)
+        from the stored history of a database created before they existed
+        """
+        with self._transaction() as conn:
+            for row in conn.execute("SELECT id, usage_count FROM questions").fetchall():
+                question = {
+                    'usage_count': row['usage_count'],
+                    'performance_history': [dict(h) for h in conn.execute(
+                        "SELECT score, timestamp FROM performance_history WHERE question_id = ? ORDER BY id",
+                        (row['id'],))]
+                }
+                ensure_score_stats(question)
+                conn.execute("UPDATE questions SET score_m2 = ?, score_histogram = ? WHERE id = ?",
+                             (question['score_m2'], json.dumps(question['score_histogram']), row['id']))
+                if rollups:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO daily_rollups(question_id, day, count, total, min_score, max_score) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [(row['id'], day, r['count'], r['total'], r['min'], r['max'])
+                         for day, r in question['daily_rollups'].items()]
+                    )
+
+    def _insert(self, conn: sqlite3.Connection, question: Dict):
+        question = dict(question)
+        ensure_score_stats(question)
+        native = {col: question.get(col, COLUMN_DEFAULTS.get(col)) for col in QUESTION_COLUMNS}
+        native['generated'] = int(bool(native['generated']))
+        extra = {
+            k: v for k, v in question.items()
+            if k not in QUESTION_COLUMNS
+            and k not in ("target_roles", "performance_history", "score_histogram", "daily_rollups")
+        }
+        conn.execute(
+            f"INSERT INTO questions({', '.join(QUESTION_COLUMNS)}, score_histogram, text_key, extra) "
+            f"VALUES ({', '.join('?' * len(QUESTION_COLUMNS))}, ?, ?, ?)",
+            [native[col] for col in QUESTION_COLUMNS]
+            + [json.dumps(question['score_histogram']), normalise_question_text(question.get('question')),
+               json.dumps(extra, ensure_ascii=False)]
+        )
+        conn.executemany(
+            "INSERT INTO daily_rollups(question_id, day, count, total, min_score, max_score) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(question['id'], day, r['count'], r['total'], r['min'], r['max'])
+             for day, r in question['daily_rollups'].items()]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO question_roles(role, question_id) VALUES (?, ?)",
+            [(role, question['id']) for role in question.get('target_roles', [])]
+        )
+        conn.executemany(
+            "INSERT INTO performance_history(question_id, score, timestamp, outcome) VALUES (?, ?, ?, ?)",
+            [(question['id'], h['score'], h['timestamp'], h.get('outcome'))
+             for h in question.get('performance_history', [])[-self.history_limit:]]
+        )
+
+    def _row_to_question(self, row: sqlite3.Row) -> Dict:
+        question = json.loads(row['extra'])
+        for col in QUESTION_COLUMNS:
+            question[col] = row[col]
+        question['generated'] = bool(question['generated'])
+        question['score_histogram'] = json.loads(row['score_histogram'])
+        question['target_roles'] = json.loads(row['target_roles'] or "[]")
+        return question
+
+    def _touch(self, conn: sqlite3.Connection) -> int:
+        """Stamp a write transaction and advance the change count; returns the count before it"""
+        conn.execute(
+            "INSERT OR REPLACE INTO metadata(key, value) VALUES ('last_updated', ?)",
+            (json.dumps(datetime.now().isoformat()),)
+        )
+        previous = self._change_count(conn)
+        conn.execute("INSERT OR REPLACE INTO metadata(key, value) VALUES (?, ?)", (CHANGE_COUNT_KEY, previous + 1))
+        return previous
+
+    @staticmethod
+    def _change_count(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM metadata WHERE key = ?", (CHANGE_COUNT_KEY,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _refresh_samplers(self, previous: int, stored: List[Dict] = (), updated: List[tuple] = (),
+                          deleted: List[Any] = ()):
+        """
+        Apply a write committed through this instance to the cached samplers.
+        previous: change count before the write; if another connection wrote since the
+        samplers were built, they are dropped and rebuilt on the next draw instead.
+        """
+        with self._sampler_lock:
+            if self._sampler_version != previous:
+                self._samplers.clear()
+                self._sampler_version = None
+                return
+            self._sampler_version = previous + 1
+            for facets, sampler in self._samplers.items():
+                for question in stored:
+                    if matches_facets(question, *facets):
+                        sampler.set(question['id'], question.get('effectiveness_score', 0))
+                for question_id, effectiveness in updated:
+                    if question_id in sampler:
+                        sampler.set(question_id, effectiveness)
+                for question_id in deleted:
+                    sampler.remove(question_id)
+
+    def store_question(self, question: Dict, performance_data: Dict = None):
+        """
+        Store new question with performance metadata.
+        Returns the id the question is stored under: re-storing a known question
+        (same id, or same normalised text) keeps the existing record and returns its id.
+        """
+        with self._transaction() as conn:
+            question_id, question_entry = self._store(conn, question, performance_data)
+            if question_entry:
+                previous = self._touch(conn)
+        if question_entry:
+            self._refresh_samplers(previous, stored=[question_entry])
+            notify_listeners(self._listeners, "store", question_entry)
+        return question_id
+
+    def store_questions(self, questions: List[Dict]) -> List[Any]:
+        """
+        Store many questions in one transaction (e.g. the expanded template catalogue).
+        Returns the stored id of each question, in order; known questions keep their record.
+        """
+        ids = []
+        added = []
+        with self._transaction() as conn:
+            for question in questions:
+                question_id, question_entry = self._store(conn, question)
+                ids.append(question_id)
+                if question_entry:
+                    added.append(question_entry)
+            if added:
+                previous = self._touch(conn)
+        if added:
+            self._refresh_samplers(previous, stored=added)
+        for question_entry in added:
+            notify_listeners(self._listeners, "store", question_entry)
+        return ids
+
+    def _store(self, conn: sqlite3.Connection, question: Dict, performance_data: Dict = None):
+        """Insert a question unless it is already stored; returns (id, new entry or None)"""
+        if 'id' in question and conn.execute("SELECT 1 FROM questions WHERE id = ?", (question['id'],)).fetchone():
+            return question['id'], None
+        existing = conn.execute(
+            "SELECT id FROM questions WHERE text_key = ? ORDER BY rowid LIMIT 1",
+            (normalise_question_text(question.get('question')),)
+        ).fetchone()
+        if existing:
+            return existing['id'], None
+
+        # Generate unique sequential ID if not provided; content-addressed ids are left out
+        if 'id' not in question:
+            question['id'] = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) + 1 FROM questions WHERE id < ?", (CONTENT_ID_BASE,)
+            ).fetchone()[0]
+
+        question_entry = {
+            **question,
+            "usage_count": 0,
+            "avg_score": 0.0,
+            "success_rate": 0.0,
+            "effectiveness_score": 0.5,
+            "created_date": datetime.now().isoformat(),
+            "performance_history": []
+        }
+        if performance_data:
+            question_entry.update(performance_data)
+
+        self._insert(conn, question_entry)
+        return question_entry['id'], question_entry
+
+    def update_question_performance(self, question_id: int, score: int, outcome: str = None):
+        """Update question performance based on candidate results"""
+        self.update_questions_performance([{'question_id': question_id, 'score': score, 'outcome': outcome}])
+
+    @metrics.timer("store_seconds", STORE_HELP, operation="update")
+    def update_questions_performance(self, updates: List[Dict]):
+        """
+        Record several results in one transaction.
+        updates: List of dicts with 'question_id', 'score' and optional 'outcome' keys
+        """
+        timestamp = datetime.now().isoformat()
+        changes = []
+        with self._transaction() as conn:
+            for update in updates:
+                change = self._apply_performance_update(conn, update['question_id'], update['score'],
+                                                        update.get('outcome'), timestamp)
+                if change:
+                    changes.append(change)
+            previous = self._touch(conn)
+        self._refresh_samplers(previous, updated=[(question_id, effectiveness)
+                                                  for question_id, _, effectiveness in changes])
+        if self._listeners:
+            # Listeners only hear about committed changes
+            for question_id, previous_effectiveness, effectiveness in changes:
+                question = {'id': question_id, 'effectiveness_score': effectiveness,
+                            'target_roles': self._roles_of(question_id)}
+                notify_listeners(self._listeners, "update", question, previous_effectiveness)
+
+    def _apply_performance_update(self, conn: sqlite3.Connection, question_id: int, score: float,
+                                  outcome: str, timestamp: str):
+        """
+        Fold one scored answer into a question's statistics.
+        Returns (question_id, previous effectiveness, new effectiveness), or None for an unknown id
+        """
+        row = conn.execute(
+            "SELECT usage_count, avg_score, success_rate, score_m2, score_histogram, effectiveness_score "
+            "FROM questions WHERE id = ?",
+            (question_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        stats = dict(row)
+        previous_effectiveness = stats['effectiveness_score']
+        stats['score_histogram'] = json.loads(stats['score_histogram']) or [0] * HISTOGRAM_BINS
+        record_score(stats, score, outcome)
+        stats['effectiveness_score'] = self._calculate_effectiveness(stats)
+        conn.execute(
+            "UPDATE questions SET usage_count = ?, avg_score = ?, success_rate = ?, score_m2 = ?, "
+            "score_histogram = ?, effectiveness_score = ? WHERE id = ?",
+            (stats['usage_count'], stats['avg_score'], stats['success_rate'], stats['score_m2'],
+             json.dumps(stats['score_histogram']), stats['effectiveness_score'], question_id)
+        )
+        self._record_history(conn, question_id, score, outcome, timestamp)
+        return question_id, previous_effectiveness, stats['effectiveness_score']
+
+    def _record_history(self, conn: sqlite3.Connection, question_id: int, score: float, outcome: str, timestamp: str):
+        """Append a raw event, roll it into its day, and apply the retention policy"""
+        conn.execute(
+            "INSERT INTO performance_history(question_id, score, timestamp, outcome) VALUES (?, ?, ?, ?)",
+            (question_id, score, timestamp, outcome)
+        )
+        conn.execute(
+            "DELETE FROM performance_history WHERE question_id = ? AND id NOT IN "
+            "(SELECT id FROM performance_history WHERE question_id = ? ORDER BY id DESC LIMIT ?)",
+            (question_id, question_id, self.history_limit)
+        )
+        conn.execute(
+            "INSERT INTO daily_rollups(question_id, day, count, total, min_score, max_score) "
+            "VALUES (?, ?, 1, ?, ?, ?) "
+            "ON CONFLICT(question_id, day) DO UPDATE SET count = count + 1, total = total + excluded.total, "
+            "min_score = MIN(min_score, excluded.min_score), max_score = MAX(max_score, excluded.max_score)",
+            (question_id, timestamp[:10], score, score, score)
+        )
+        conn.execute(
+            "DELETE FROM daily_rollups WHERE question_id = ? AND day NOT IN "
+            "(SELECT day FROM daily_rollups WHERE question_id = ? ORDER BY day DESC LIMIT ?)",
+            (question_id, question_id, self.rollup_days)
+        )
+
+    def _calculate_effectiveness(self, question: Dict) -> float:
+        """Calculate how effective a question is at predicting performance"""
+        return calculate_effectiveness(question)
+
+    @metrics.timer("store_seconds", STORE_HELP, operation="query")
+    def get_questions_by_criteria(self,
+                                  category: str = None,
+                                  difficulty: str = None,
+                                  role: str = None,
+                                  min_effectiveness: float = 0.0,
+                                  count: int = None) -> List[Dict]:
+        """Retrieve questions based on specific criteria, best first"""
+        clauses, params = self._facet_clauses(category, difficulty, role)
+        if min_effectiveness > 0:
+            clauses.append("q.effectiveness_score >= ?")
+            params.append(min_effectiveness)
+        return self._select(clauses, params, count)
+
+    @staticmethod
+    def _facet_clauses(category: str = None, difficulty: str = None, role: str = None):
+        clauses, params = [], []
+        if category:
+            clauses.append("q.category = ?")
+            params.append(category)
+        if difficulty:
+            clauses.append("q.difficulty = ?")
+            params.append(difficulty)
+        if role:
+            clauses.append("q.id IN (SELECT question_id FROM question_roles WHERE role = ?)")
+            params.append(role)
+        return clauses, params
+
+    @metrics.timer("store_seconds", STORE_HELP, operation="sample")
+    def sample_questions(self,
+                         category: str = None,
+                         difficulty: str = None,
+                         role: str = None,
+                         count: int = 1,
+                         exclude=()) -> List[Dict]:
+        """
+        Draw up to `count` distinct matching questions, weighted by effectiveness.
+        Each filter gets a WeightedSampler built from one pass over its candidates'
+        (id, effectiveness) rows and kept for later calls, so a draw is O(log n).
+        Writes through this instance update the samplers in place; a write from
+        another connection or process (seen as a newer change count) makes the next
+        call rebuild them.
+        """
+        facets = (category, difficulty, role)
+        conn = self._connection()
+        with self._sampler_lock:
+            version = self._change_count(conn)
+            if version != self._sampler_version:
+                self._samplers.clear()
+                self._sampler_version = version
+            sampler = self._samplers.get(facets)
+            if sampler is None:
+                clauses, params = self._facet_clauses(category, difficulty, role)
+                sql = "SELECT q.id, q.effectiveness_score FROM questions q"
+                if clauses:
+                    sql += " WHERE " + " AND ".join(clauses)
+                sampler = WeightedSampler({row['id']: row['effectiveness_score']
+                                           for row in conn.execute(sql, params)}, floor=SAMPLING_FLOOR)
+                self._samplers[facets] = sampler
+            ids = sampler.sample(count, exclude)
+        if not ids:
+            return []
+        by_id = {q['id']: q for q in self._select([f"q.id IN ({', '.join('?' * len(ids))})"], list(ids))}
+        return [by_id[question_id] for question_id in ids if question_id in by_id]
+
+    def _select(self, clauses: List[str], params: List, count: int = None) -> List[Dict]:
+        """Run a question query ordered by effectiveness"""
+        sql = SELECT_QUESTION
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY q.effectiveness_score DESC, q.id"
+        if count:
+            sql += " LIMIT ?"
+            params.append(count)
+        rows = self._connection().execute(sql, list(params)).fetchall()
+        return [self._row_to_question(row) for row in rows]
+
+    @metrics.timer("store_seconds", STORE_HELP, operation="best")
+    def get_best_questions(self, role: str, count: int = 6, sample: bool = False) -> List[Dict]:
+        """
+        Get the most effective questions for a specific role.
+        sample: draw by effectiveness instead of always taking the top ones
+        """
+        selected_questions = []
+        for difficulty in ['basic', 'intermediate', 'advanced']:
+            # Take top 2 from each difficulty level
+            if sample:
+                selected_questions.extend(self.sample_questions(difficulty=difficulty, role=role, count=2))
+            else:
+                selected_questions.extend(self.get_questions_by_criteria(difficulty=difficulty, role=role, count=2))
+        if sample and len(selected_questions) < count:
+            selected_questions.extend(self.sample_questions(role=role, count=count - len(selected_questions),
+                                                            exclude=[q['id'] for q in selected_questions]))
+
+        # If we need more questions, fill with remaining best questions
+        if len(selected_questions) < count:
+            selected_ids = [q['id'] for q in selected_questions]
+            clauses = ["q.id IN (SELECT question_id FROM question_roles WHERE role = ?)"]
+            if selected_ids:
+                clauses.append(f"q.id NOT IN ({', '.join('?' * len(selected_ids))})")
+            selected_questions.extend(self._select(clauses, [role] + selected_ids, count - len(selected_questions)))
+        return selected_questions[:count]
+
+    def get_question_by_id(self, question_id: int) -> Optional[Dict]:
+        """Retrieve a specific question by ID, including its performance history"""
+        conn = self._connection()
+        row = conn.execute(SELECT_QUESTION + " WHERE q.id = ?", (question_id,)).fetchone()
+        if row is None:
+            return None
+        question = self._row_to_question(row)
+        question['performance_history'] = [
+            dict(h) for h in conn.execute(
+                "SELECT score, timestamp, outcome FROM performance_history WHERE question_id = ? ORDER BY id",
+                (question_id,)
+            )
+        ]
+        question['daily_rollups'] = {
+            r['day']: {'count': r['count'], 'total': r['total'], 'min': r['min_score'], 'max': r['max_score']}
+            for r in conn.execute("SELECT * FROM daily_rollups WHERE question_id = ? ORDER BY day", (question_id,))
+        }
+        return question
+
+    def delete_question(self, question_id: int) -> bool:
+        """Delete a question from storage"""
+        roles = self._roles_of(question_id) if self._listeners else []
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM questions WHERE id = ?", (question_id,)).rowcount > 0
+            if deleted:
+                previous = self._touch(conn)
+        if deleted:
+            self._refresh_samplers(previous, deleted=[question_id])
+            notify_listeners(self._listeners, "delete", {'id': question_id, 'target_roles': roles})
+        return deleted
+
+    def get_analytics(self) -> Dict[str, Any]:
+        """Get analytics about the question bank"""
+        conn = self._connection()
+        total_questions, total_usage, avg_effectiveness = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(usage_count), 0), AVG(effectiveness_score) FROM questions"
+        ).fetchone()
+        if not total_questions:
+            return {"error": "No questions in database"}
+
+        categories = dict(conn.execute(
+            "SELECT COALESCE(category, 'unknown'), COUNT(*) FROM questions GROUP BY 1"
+        ).fetchall())
+        difficulties = dict(conn.execute(
+            "SELECT COALESCE(difficulty, 'unknown'), COUNT(*) FROM questions GROUP BY 1"
+        ).fetchall())
+        top_questions = conn.execute(
+            "SELECT id, question, effectiveness_score FROM questions "
+            "ORDER BY effectiveness_score DESC, id LIMIT 5"
+        ).fetchall()
+        last_updated = conn.execute("SELECT value FROM metadata WHERE key = 'last_updated'").fetchone()
+
+        return {
+            'total_questions': total_questions,
+            'total_usage': total_usage,
+            'average_effectiveness': round(avg_effectiveness, 3),
+            'category_distribution': categories,
+            'difficulty_distribution': difficulties,
+            'top_questions': [
+                {
+                    'id': q['id'],
+                    'question': q['question'][:50] + '...',
+                    'effectiveness': q['effectiveness_score']
+                }
+                for q in top_questions
+            ],
+            'last_updated': json.loads(last_updated[0]) if last_updated else None
+        }
+
+    def save_questions(self):
+        """Every write is committed in its own transaction; kept for API compatibility"""
+        pass
+
+    def backup_questions(self, backup_file: str = None):
+        """Export the database as a JSON bank file"""
+        if not backup_file:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            backup_file = f"questions_backup_{timestamp}.json"
+
+        conn = self._connection()
+        questions = [self.get_question_by_id(row[0]) for row in conn.execute("SELECT id FROM questions ORDER BY id")]
+        metadata = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM metadata")
+                    if key != CHANGE_COUNT_KEY}
+        try:
+            with open(backup_file, 'w') as f:
+                json.dump({
+                    'questions': questions,
+                    'metadata': metadata
+                }, f, indent=2)
+            return backup_file
+        except IOError:
+            logger.exception("Error creating backup %s", backup_file)
+            return None
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Stress test: many processes updating one question bank file at once.
+Each worker records answers against the seed questions and stores a few new
+questions (some shared by every worker), then the bank is reloaded and checked:
+no update lost, no duplicate question, file still valid JSON.
+
+    python stress_storage.py --processes 8 --updates 200
+    python stress_storage.py --backend journal
+
+Runs against a temporary copy of the bank; dynamic_questions.json is not touched.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def worker(storage_file: str, backend: str, worker_id: int, updates: int, stores: int, seed: int):
+    from questions_store import load_storage_agent
+
+    rng = random.Random(seed + worker_id)
+    storage = load_storage_agent(storage_file, backend=backend)
+    ids = [q['id'] for q in storage.get_questions_by_criteria()]
+    for i in range(updates):
+        storage.update_question_performance(rng.choice(ids), rng.randint(0, 100))
+        if i % max(updates // stores, 1) == 0:
+            storage.store_question({"question": f"Worker {worker_id} question {i}?",
+                                    "category": "stress", "difficulty": "basic"})
+            # Every worker races to store this one; it must end up stored once
+            storage.store_question({"question": f"Shared question {i}?",
+                                    "category": "stress", "difficulty": "basic"})
+
+
+def bank_totals(storage_file: str, backend: str):
+    from questions_store import load_storage_agent
+    storage = load_storage_agent(storage_file, backend=backend, shared=False)
+    questions = storage.get_questions_by_criteria()
+    return {
+        'usage': sum(q.get('usage_count', 0) for q in questions),
+        'versions': sum(q.get('version', 0) for q in questions),
+        'ids': [q['id'] for q in questions],
+        'texts': [q['question'] for q in questions]
+    }
+
+
+def run_stress(processes: int, updates: int, stores: int, backend: str, seed: int) -> bool:
+    workdir = tempfile.mkdtemp(prefix="stress_storage_")
+    storage_file = os.path.join(workdir, "dynamic_questions.json")
+    shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), "dynamic_questions.json"), storage_file)
+    try:
+        before = bank_totals(storage_file, backend)
+        started = time.perf_counter()
+        workers = [
+            multiprocessing.Process(target=worker, args=(storage_file, backend, n, updates, stores, seed))
+            for n in range(processes)
+        ]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join()
+        elapsed = time.perf_counter() - started
+        after = bank_totals(storage_file, backend)
+
+        with open(storage_file, "r", encoding="utf-8") as f:
+            json.load(f)  # raises if the snapshot was ever left truncated
+
+        expected = processes * updates
+        lost = expected - (after['usage'] - before['usage'])
+        version_gap = expected - (after['versions'] - before['versions'])
+        duplicate_ids = len(after['ids']) - len(set(after['ids']))
+        duplicate_texts = len(after['texts']) - len(set(after['texts']))
+        failed = sum(1 for p in workers if p.exitcode != 0)
+
+        print(f"Backend: {backend}, {processes} processes x {updates} updates")
+        print(f"Elapsed: {elapsed:.2f}s ({expected / elapsed:,.0f} updates/s)")
+        print(f"Lost updates: {lost}, version gap: {version_gap}")
+        print(f"Duplicate ids: {duplicate_ids}, duplicate questions: {duplicate_texts}")
+        print(f"Failed workers: {failed}")
+        return lost == 0 and version_gap == 0 and duplicate_ids == 0 and duplicate_texts == 0 and failed == 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--updates", type=int, default=200, help="answers recorded per process")
+    parser.add_argument("--stores", type=int, default=5, help="new questions stored per process")
+    parser.add_argument("--backend", choices=["json", "journal"], default="json")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    success = run_stress(args.processes, args.updates, args.stores, args.backend, args.seed)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import re
+import time
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """
+    Deterministic local stand-in for genai.GenerativeModel.
+    Scores each "Candidate Answer:" in the prompt from a hash of its text, so the
+    AI evaluation path (batching, caching, blending) can run offline.
+    latency: seconds to sleep per call, to imitate a network round trip
+    """
+
+    def __init__(self, model_name: str = "stub", latency: float = 0.0):
+        self.model_name = model_name
+        self.latency = latency
+        self.calls = 0
+
+    def generate_content(self, prompt: str) -> StubResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+
+        answers = re.findall(r"Candidate Answer: (.*)", prompt)
+        results = [self._evaluate(answer) for answer in answers]
+        if re.search(r"^\s*Item 1\s*$", prompt, re.MULTILINE):
+            for item, result in enumerate(results, start=1):
+                result['item'] = item
+            return StubResponse(json.dumps(results))
+        return StubResponse(json.dumps(results[0] if results else {}))
+
+    @staticmethod
+    def _evaluate(answer: str) -> dict:
+        digest = hashlib.md5(answer.strip().lower().encode("utf-8")).digest()
+        return {
+            'ai_score': digest[0] % 101,
+            'strengths': ["Addresses the question"],
+            'improvements': ["Add a worked example"],
+            'feedback': "Stub evaluation."
+        }
@@ -0,0 +1,143 @@
+import random
+from typing import Dict, List, Any, Iterable
+
+# Minimum sampling weight, so questions with a low (or zero) effectiveness score still get asked
+SAMPLING_FLOOR = 0.05
+
+
+class FenwickTree:
+    """Binary indexed tree over float weights: point update, prefix sum and prefix search in O(log n)"""
+
+    def __init__(self, weights: List[float] = ()):
+        self.rebuild(weights)
+
+    def rebuild(self, weights: List[float]):
+        """O(n) construction from a full weight list"""
+        self.size = len(weights)
+        self._tree = [0.0] + list(weights)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self._tree[parent] += self._tree[i]
+
+    def add(self, index: int, delta: float):
+        i = index + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, count: int) -> float:
+        """Sum of the first `count` weights"""
+        total = 0.0
+        i = count
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, target: float) -> int:
+        """Smallest index whose inclusive prefix sum exceeds target"""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self._tree[nxt] <= target:
+                position = nxt
+                target -= self._tree[nxt]
+            step >>= 1
+        return position
+
+
+class WeightedSampler:
+    """
+    Items drawn with probability proportional to their weight.
+    Set/remove and each draw are O(log n); k draws without replacement are
+    O(k log n): drawn items are zeroed for the rest of the call, then restored.
+    Every weight is raised to at least `floor`, so low scorers still get exposure.
+    """
+
+    def __init__(self, weights: Dict[Any, float] = None, floor: float = SAMPLING_FLOOR):
+        self.floor = floor
+        self._slots: Dict[Any, int] = {}
+        self._ids: List[Any] = []
+        self._weights: List[float] = []
+        self._free: List[int] = []
+        for item_id, weight in (weights or {}).items():
+            self._slots[item_id] = len(self._ids)
+            self._ids.append(item_id)
+            self._weights.append(max(weight, floor))
+        self._tree = FenwickTree(self._weights)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, item_id) -> bool:
+        return item_id in self._slots
+
+    def set(self, item_id, weight: float):
+        """Add an item or change its weight"""
+        weight = max(weight, self.floor)
+        slot = self._slots.get(item_id)
+        if slot is None:
+            slot = self._allocate(item_id)
+        self._tree.add(slot, weight - self._weights[slot])
+        self._weights[slot] = weight
+
+    def remove(self, item_id):
+        slot = self._slots.pop(item_id, None)
+        if slot is None:
+            return
+        self._tree.add(slot, -self._weights[slot])
+        self._weights[slot] = 0.0
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def sample(self, count: int, exclude: Iterable[Any] = (), rng: random.Random = None) -> List[Any]:
+        """Up to `count` distinct items, drawn by weight, never returning excluded ids"""
+        rng = rng or random
+        zeroed = []
+        for item_id in exclude:
+            slot = self._slots.get(item_id)
+            if slot is not None and self._weights[slot]:
+                zeroed.append((slot, self._weights[slot]))
+                self._zero(slot)
+
+        drawn = []
+        try:
+            while len(drawn) < count:
+                total = self._tree.prefix(self._tree.size)
+                if total <= 0 or len(zeroed) >= len(self._slots):
+                    break
+                slot = self._tree.find(rng.random() * total)
+                if slot >= self._tree.size or not self._weights[slot]:
+                    # Rounding at the top of the range; take the last live slot instead
+                    slot = max(i for i, w in enumerate(self._weights) if w)
+                drawn.append(self._ids[slot])
+                zeroed.append((slot, self._weights[slot]))
+                self._zero(slot)
+        finally:
+            for slot, weight in zeroed:
+                self._tree.add(slot, weight)
+                self._weights[slot] = weight
+        return drawn
+
+    def _zero(self, slot: int):
+        self._tree.add(slot, -self._weights[slot])
+        self._weights[slot] = 0.0
+
+    def _allocate(self, item_id) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = item_id
+        else:
+            slot = len(self._ids)
+            self._ids.append(item_id)
+            self._weights.append(0.0)
+            if slot >= self._tree.size:
+                # Grow geometrically so appends stay amortised O(log n)
+                self._tree.rebuild(self._weights + [0.0] * len(self._weights))
+                self._weights.extend([0.0] * (self._tree.size - len(self._weights)))
+                self._ids.extend([None] * (self._tree.size - len(self._ids)))
+                self._free.extend(range(self._tree.size - 1, slot, -1))
+        self._slots[item_id] = slot
+        return slot